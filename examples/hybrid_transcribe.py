@@ -9,6 +9,9 @@ from src.hybrid_stt import HybridSTT
 
 
 def main():
+    # --profile writes a torch trace + Python flamegraph per clip to profiles/
+    profile = "--profile" in sys.argv[1:]
+    
     # Initialize hybrid STT
     print("Initializing STT System...\n")
     stt = HybridSTT()
@@ -28,7 +31,7 @@ def main():
         
         try:
             # Auto-detect and transcribe
-            result = stt.transcribe(str(audio_file))
+            result = stt.transcribe(str(audio_file), profile=profile or None)
             
             # Display results
             engine_display = {
@@ -32,7 +32,7 @@ class AudioThread(QThread):
         self.audio_queue = queue.Queue()
         self.audio_buffer = []
         self.sample_rate = 16000
-        self.chunk_ = 15
+        self.chunk_duration = stt_engine.config.audio.chunk_duration
         self.running = True
         
     def audio_callback(self, indata, frames, time, status):
@@ -211,7 +211,7 @@ class HybridSTTGUI(QMainWindow):
         self.duration_spin = QSpinBox()
         self.duration_spin.setMinimum(1)
         self.duration_spin.setMaximum(10)
-        self.duration_spin.setValue(3)
+        self.duration_spin.setValue(int(self.stt.config.audio.chunk_duration))
         self.duration_spin.valueChanged.connect(self.on_duration_changed)
         
         layout.addWidget(self.record_btn, 2)
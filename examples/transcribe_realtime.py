@@ -12,7 +12,10 @@ import time
 def main():
     # Initialize components
     stt = WhisperSTT()
-    audio_proc = AudioProcessor(chunk_duration=5)
+    audio_proc = AudioProcessor(
+        chunk_duration=stt.config.audio.chunk_duration,
+        shared_memory=stt.config.audio.shared_memory
+    )
     
     print("Real-time transcription starting...")
     print("Speak into your microphone. Press Ctrl+C to stop.\n")
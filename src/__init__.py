@@ -1,8 +1,16 @@
+from .config import Config, ConfigError, load_config
 from .whisper_stt import WhisperSTT
 from .indic_stt import IndicSTT
 from .hybrid_stt import HybridSTT
 from .audio_processor import AudioProcessor
+from .model_pool import ModelPool
+from .profiling import RequestProfiler
+from .ctc_decoder import GreedyCTCDecoder
+from .shared_audio import SharedAudioBuffer, CaptureProcess
 
 __version__ = "0.2.0"
-__all__ = ["WhisperSTT", "IndicSTT", "HybridSTT", "AudioProcessor"]
+__all__ = ["WhisperSTT", "IndicSTT", "HybridSTT", "AudioProcessor",
+           "SharedAudioBuffer", "CaptureProcess", "GreedyCTCDecoder",
+           "ModelPool", "Config", "ConfigError", "load_config",
+           "RequestProfiler"]
 
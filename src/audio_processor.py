@@ -1,17 +1,28 @@
-import sounddevice as sd
 import numpy as np
 import queue
 import threading
 
+from .shared_audio import CaptureProcess
+
 class AudioProcessor:
     """Handle real-time audio input from microphone"""
     
-    def __init__(self, sample_rate=16000, chunk_duration=5):
+    def __init__(self, sample_rate=16000, chunk_duration=5, shared_memory=False):
+        """
+        Args:
+            sample_rate: Capture sample rate
+            chunk_duration: Seconds of audio per chunk
+            shared_memory: Capture in a separate process writing to a
+                shared-memory ring instead of an in-process callback
+        """
         self.sample_rate = sample_rate
         self.chunk_duration = chunk_duration
         self.chunk_samples = int(sample_rate * chunk_duration)
         self.audio_queue = queue.Queue()
         self.is_recording = False
+        self.shared_memory = shared_memory
+        self.capture = None
+        self._pending = []
         
     def _audio_callback(self, indata, frames, time, status):
         """Callback for sounddevice stream"""
@@ -22,6 +33,16 @@ class AudioProcessor:
     def start_recording(self):
         """Start recording from microphone"""
         self.is_recording = True
+        if self.shared_memory:
+            self.capture = CaptureProcess(
+                sample_rate=self.sample_rate,
+                buffer_duration=max(30, 2 * self.chunk_duration)
+            )
+            self.capture.start()
+            print("Recording started (capture process)...")
+            return
+        # Imported here so headless inference processes don't need PortAudio
+        import sounddevice as sd
         self.stream = sd.InputStream(
             samplerate=self.sample_rate,
             channels=1,
@@ -34,13 +55,28 @@ class AudioProcessor:
     def stop_recording(self):
         """Stop recording"""
         self.is_recording = False
+        if self.capture is not None:
+            print(f"Capture overflows: {self.capture.buffer.overflows}, "
+                  f"dropped blocks: {self.capture.buffer.dropped}")
+            self.capture.stop()
+            self.capture = None
+            self._pending = []
         if hasattr(self, 'stream'):
             self.stream.stop()
             self.stream.close()
         print("Recording stopped.")
     
     def get_audio_chunk(self):
-        """Get accumulated audio chunk for transcription"""
+        """
+        Get accumulated audio chunk for transcription
+        
+        Returns up to chunk_duration of the audio captured since the last
+        call, or None if nothing new arrived. Both capture modes behave the
+        same; callers that need full chunks should buffer the result.
+        """
+        if self.capture is not None:
+            return self._get_shared_chunk()
+
         audio_data = []
         target_samples = self.chunk_samples
         
@@ -51,3 +87,38 @@ class AudioProcessor:
             return np.array(audio_data).flatten()
         return None
 
+    def get_audio_blocks(self):
+        """
+        Get new blocks from the capture process without copying
+
+        Copy each block and confirm it with ``capture.buffer.is_valid``
+        before use; raises RuntimeError if the capture process failed.
+
+        Returns:
+            list of AudioBlock(seq, timestamp, samples) views into shared memory
+        """
+        if self.capture is None:
+            return []
+        self.capture.check()
+        return self.capture.buffer.read()
+
+    def _get_shared_chunk(self):
+        """Take up to one chunk of audio from the shared-memory ring"""
+        self.capture.check()
+        ring = self.capture.buffer
+
+        # Copy out of the ring, then drop any block the writer touched meanwhile
+        for block in ring.read():
+            samples = block.samples.copy()
+            if ring.is_valid(block):
+                self._pending.append(samples)
+            else:
+                ring.dropped += 1
+
+        if not self._pending:
+            return None
+
+        audio = np.concatenate(self._pending)
+        chunk, rest = audio[:self.chunk_samples], audio[self.chunk_samples:]
+        self._pending = [rest] if len(rest) else []
+        return chunk
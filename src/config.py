@@ -0,0 +1,299 @@
+import os
+import typing
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import Dict, List, Optional
+
+import torch
+import yaml
+
+
+ENV_PREFIX = "STT__"
+DEFAULT_INDIC_MODEL = "gvs/wav2vec2-large-xlsr-malayalam"
+
+
+class ConfigError(ValueError):
+    """Raised when config.yaml or an STT__ override is invalid"""
+
+
+@dataclass
+class ModelConfig:
+    """Whisper model selection"""
+    size: str = "small"
+    device: str = "auto"
+    language: Optional[str] = None
+
+
+@dataclass
+class PerformanceConfig:
+    """Compute knobs shared by all engines"""
+    fp16: bool = True
+    beam_size: int = 5
+    best_of: int = 5
+    threads: Optional[int] = None
+    batch_size: int = 4
+    quantization: str = "none"
+
+
+@dataclass
+class DecodingConfig:
+    """Whisper fast-path policy (doubles as the no-speech / VAD gate)"""
+    fast_path: bool = True
+    no_speech_threshold: float = 0.6
+    logprob_threshold: float = -1.0
+    compression_ratio_threshold: float = 2.4
+    temperature_fallback: List[float] = field(
+        default_factory=lambda: [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
+    )
+
+
+@dataclass
+class IndicConfig:
+    """Wav2Vec2 models, either one model_name or a per-language models map"""
+    model_name: Optional[str] = None
+    language_code: str = "ml"
+    device: str = "auto"
+    models: Dict[str, str] = field(default_factory=dict)
+    max_pause: float = 0.5
+
+    @property
+    def language_models(self):
+        return self.models or {self.language_code: self.model_name or DEFAULT_INDIC_MODEL}
+
+
+@dataclass
+class AudioConfig:
+    """Microphone capture (16 kHz mono, as Whisper expects)"""
+    chunk_duration: float = 5
+    shared_memory: bool = False
+
+
+@dataclass
+class LanguageDetectionConfig:
+    supported_languages: List[str] = field(default_factory=lambda: ["en", "ar", "ml"])
+
+
+@dataclass
+class StreamingConfig:
+    window_seconds: float = 30
+
+
+@dataclass
+class ConcurrencyConfig:
+    """Async API executor"""
+    max_concurrency: int = 1
+    timeout: Optional[float] = None
+
+
+@dataclass
+class ModelPoolConfig:
+    """Model cache"""
+    memory_budget_mb: float = 4096
+    preload: bool = True
+
+
+@dataclass
+class ProfilingConfig:
+    """Per-request torch + Python profiling (also enabled per call)"""
+    enabled: bool = False
+    sample_rate: float = 1.0
+    output_dir: str = "profiles"
+    python_interval_ms: float = 5
+
+
+@dataclass
+class Config:
+    model: ModelConfig = field(default_factory=ModelConfig)
+    performance: PerformanceConfig = field(default_factory=PerformanceConfig)
+    decoding: DecodingConfig = field(default_factory=DecodingConfig)
+    indic: IndicConfig = field(default_factory=IndicConfig)
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    language_detection: LanguageDetectionConfig = field(default_factory=LanguageDetectionConfig)
+    streaming: StreamingConfig = field(default_factory=StreamingConfig)
+    concurrency: ConcurrencyConfig = field(default_factory=ConcurrencyConfig)
+    model_pool: ModelPoolConfig = field(default_factory=ModelPoolConfig)
+    profiling: ProfilingConfig = field(default_factory=ProfilingConfig)
+
+    def validate(self):
+        """Reject out-of-range values and contradictory combinations"""
+        errors = []
+
+        for name, device in (("model.device", self.model.device),
+                             ("indic.device", self.indic.device)):
+            if device not in ("auto", "cpu", "cuda"):
+                errors.append(f"{name} must be auto, cpu or cuda, got '{device}'")
+            elif device == "cuda" and not torch.cuda.is_available():
+                errors.append(f"{name} is 'cuda' but no GPU is available (use 'auto' or 'cpu')")
+
+        perf = self.performance
+        if perf.beam_size < 1 or perf.best_of < 1:
+            errors.append("performance.beam_size and performance.best_of must be >= 1")
+        if perf.batch_size < 1:
+            errors.append("performance.batch_size must be >= 1")
+        if perf.threads is not None and perf.threads < 1:
+            errors.append("performance.threads must be >= 1")
+        if perf.quantization not in ("none", "int8"):
+            errors.append(f"performance.quantization must be none or int8, got '{perf.quantization}'")
+        if perf.quantization == "int8" and "cuda" in (resolve_device(self.model.device),
+                                                      resolve_device(self.indic.device)):
+            errors.append("performance.quantization 'int8' is CPU-only but a device resolves to cuda")
+
+        if not self.decoding.temperature_fallback:
+            errors.append("decoding.temperature_fallback must not be empty")
+
+        if self.indic.models and self.indic.model_name is not None:
+            errors.append("set either indic.models or indic.model_name, not both")
+        if self.indic.max_pause <= 0:
+            errors.append("indic.max_pause must be positive")
+        if self.audio.chunk_duration <= 0:
+            errors.append("audio.chunk_duration must be positive")
+
+        supported = self.language_detection.supported_languages
+        if self.model.language is not None and self.model.language not in supported:
+            errors.append(f"model.language '{self.model.language}' is not in "
+                          f"language_detection.supported_languages")
+
+        if not 0 < self.streaming.window_seconds <= 30:
+            errors.append("streaming.window_seconds must be in (0, 30]")
+        if self.concurrency.max_concurrency < 1:
+            errors.append("concurrency.max_concurrency must be >= 1")
+        if self.model_pool.memory_budget_mb <= 0:
+            errors.append("model_pool.memory_budget_mb must be positive")
+        if not 0 <= self.profiling.sample_rate <= 1:
+            errors.append("profiling.sample_rate must be in [0, 1]")
+        if self.profiling.python_interval_ms <= 0:
+            errors.append("profiling.python_interval_ms must be positive")
+
+        if errors:
+            raise ConfigError("Invalid configuration:\n  " + "\n  ".join(errors))
+
+
+def resolve_device(device):
+    """Map 'auto' to cuda when available, else cpu"""
+    if device == "auto":
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    return device
+
+
+def configure_torch(config):
+    """Apply process-wide torch settings from the config"""
+    if config.performance.threads:
+        torch.set_num_threads(config.performance.threads)
+
+
+def _check_type(value, hint, name):
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+
+    if origin is typing.Union:
+        if value is None and type(None) in args:
+            return None
+        hint = next(a for a in args if a is not type(None))
+        return _check_type(value, hint, name)
+
+    if origin in (list, List):
+        if not isinstance(value, list):
+            raise ConfigError(f"{name} must be a list")
+        return [_check_type(v, args[0], f"{name}[{i}]") for i, v in enumerate(value)]
+
+    if origin in (dict, Dict):
+        if not isinstance(value, dict):
+            raise ConfigError(f"{name} must be a mapping")
+        return {str(k): _check_type(v, args[1], f"{name}.{k}") for k, v in value.items()}
+
+    if hint is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if hint is int and isinstance(value, bool) or not isinstance(value, hint):
+        raise ConfigError(f"{name} must be {hint.__name__}, got {value!r}")
+    return value
+
+
+def _build(cls, data, prefix=""):
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        raise ConfigError(f"{prefix or 'config'} must be a mapping")
+
+    hints = typing.get_type_hints(cls)
+    known = {f.name for f in fields(cls)}
+    unknown = sorted(set(data) - known)
+    if unknown:
+        where = f"section '{prefix}'" if prefix else "top level"
+        raise ConfigError(f"Unknown config key(s) in {where}: {', '.join(unknown)}")
+
+    kwargs = {}
+    for name, value in data.items():
+        hint = hints[name]
+        key = f"{prefix}.{name}" if prefix else name
+        if is_dataclass(hint):
+            kwargs[name] = _build(hint, value, key)
+        else:
+            kwargs[name] = _check_type(value, hint, key)
+    return cls(**kwargs)
+
+
+def _env_hint(path):
+    """Type hint of the field addressed by an override path, or None if unknown"""
+    hint = Config
+    for part in path:
+        if not is_dataclass(hint):
+            return None
+        hint = typing.get_type_hints(hint).get(part)
+    return hint
+
+
+def _parse_env(value, hint):
+    """
+    Parse an override value
+
+    String fields take the raw text (so STT__MODEL__LANGUAGE=no stays 'no');
+    null, ~ or an empty value clears an optional string. Everything else is
+    parsed as YAML.
+    """
+    if hint is str:
+        return value
+    if hint == Optional[str]:
+        return None if yaml.safe_load(value) is None else value
+    return yaml.safe_load(value)
+
+
+def _apply_env(raw, env):
+    """Overlay STT__SECTION__KEY=value variables"""
+    for var, value in env.items():
+        if not var.startswith(ENV_PREFIX):
+            continue
+        path = var[len(ENV_PREFIX):].lower().split("__")
+        node = raw
+        for part in path[:-1]:
+            node = node.setdefault(part, {})
+            if not isinstance(node, dict):
+                raise ConfigError(f"{var} does not address a config section")
+        node[path[-1]] = _parse_env(value, _env_hint(path))
+    return raw
+
+
+def load_config(path="config/config.yaml", env=None):
+    """
+    Parse, override and validate the config once
+
+    Args:
+        path: YAML file path
+        env: Mapping of environment variables (defaults to os.environ)
+
+    Returns:
+        Config
+    """
+    with open(path, 'r') as f:
+        raw = yaml.safe_load(f) or {}
+
+    raw = _apply_env(raw, os.environ if env is None else env)
+    config = _build(Config, raw)
+    config.validate()
+    return config
+
+
+def as_config(config):
+    """Accept either a Config (validated here) or a path to a YAML file"""
+    if isinstance(config, Config):
+        config.validate()
+        return config
+    return load_config(config)
@@ -0,0 +1,154 @@
+import zlib
+
+import numpy as np
+import torch
+
+
+class GreedyCTCDecoder:
+    """
+    Vectorized greedy CTC decoder with word timestamps and confidences
+
+    Produces segments in the same schema as Whisper's ``segments`` (with
+    ``word_timestamps``), so callers can treat both engines alike. A new
+    segment starts wherever the pause between two words exceeds
+    ``max_pause``; keys that only make sense for Whisper's decoder get
+    neutral values (greedy temperature 0, no_speech_prob 0).
+    """
+
+    def __init__(self, tokenizer, frame_duration, max_pause=0.5):
+        """
+        Args:
+            tokenizer: Wav2Vec2CTCTokenizer (vocabulary and special ids)
+            frame_duration: Seconds of audio per logit frame
+            max_pause: Longest gap between words (seconds) within one segment
+        """
+        vocab = tokenizer.get_vocab()
+        id_to_token = np.empty(max(vocab.values()) + 1, dtype=object)
+        id_to_token[:] = ""
+        for token, idx in vocab.items():
+            id_to_token[idx] = token
+
+        self.id_to_token = id_to_token
+        self.blank_id = tokenizer.pad_token_id
+        self.delimiter_id = tokenizer.word_delimiter_token_id
+        self.frame_duration = frame_duration
+        self.max_pause = max_pause
+
+        # Ids that never emit a character (blank, <s>, </s>, <unk>, ...)
+        silent = set(tokenizer.all_special_ids) - {self.delimiter_id}
+        silent.add(self.blank_id)
+        self.silent_ids = torch.tensor(sorted(silent))
+
+    def decode(self, logits, lengths=None, time_offset=0.0):
+        """
+        Decode a batch of logits
+
+        Args:
+            logits: Tensor of shape (batch, frames, vocab)
+            lengths: Valid frames per item (optional, for padded batches)
+            time_offset: Seconds added to every timestamp
+
+        Returns:
+            list (one per batch item) of dicts with 'text' and 'segments'
+        """
+        log_probs = torch.log_softmax(logits.float(), dim=-1)
+        best_logp, ids = log_probs.max(dim=-1)
+
+        # Collapse repeats and drop blanks/special tokens in one pass.
+        # emit marks the first frame of each token run, run_last its final frame.
+        prev = torch.nn.functional.pad(ids[:, :-1], (1, 0), value=-1)
+        nxt = torch.nn.functional.pad(ids[:, 1:], (0, 1), value=-1)
+        emit = (ids != prev) & ~torch.isin(ids, self.silent_ids.to(ids.device))
+        run_last = ids != nxt
+
+        if lengths is not None:
+            lengths = torch.as_tensor(lengths, device=ids.device)
+            frame_idx = torch.arange(ids.shape[1], device=ids.device)
+            emit &= frame_idx[None, :] < lengths[:, None]
+            run_last |= frame_idx[None, :] == lengths[:, None] - 1
+
+        ids = ids.cpu().numpy()
+        emit = emit.cpu().numpy()
+        run_last = run_last.cpu().numpy()
+        logp_cumsum = np.cumsum(best_logp.cpu().numpy(), axis=1, dtype=np.float64)
+
+        return [
+            self._decode_item(ids[b], emit[b], run_last[b], logp_cumsum[b], time_offset)
+            for b in range(ids.shape[0])
+        ]
+
+    def _decode_item(self, ids, emit, run_last, logp_cumsum, time_offset):
+        frames = np.flatnonzero(emit)
+        tokens = ids[frames]
+
+        # Assign every emitted character to a word; delimiters bump the index
+        is_delim = tokens == self.delimiter_id
+        word_idx = np.cumsum(is_delim)[~is_delim]
+        frames, tokens = frames[~is_delim], tokens[~is_delim]
+
+        if len(tokens) == 0:
+            return {'text': '', 'segments': []}
+
+        # Last frame of each character's run (first run end at or after its start)
+        run_ends = np.flatnonzero(run_last)
+        token_ends = run_ends[np.searchsorted(run_ends, frames)]
+
+        # Log-prob mass of each character over its own frames only (no blanks)
+        run_logp = logp_cumsum[token_ends] - np.where(
+            frames > 0, logp_cumsum[frames - 1], 0.0
+        )
+        run_len = token_ends - frames + 1
+
+        _, first = np.unique(word_idx, return_index=True)
+        last = np.append(first[1:], len(tokens)) - 1
+        start_frames = frames[first]
+        end_frames = token_ends[last]
+
+        word_logp_sum = np.add.reduceat(run_logp, first)
+        word_len = np.add.reduceat(run_len, first)
+        word_logp = word_logp_sum / word_len
+
+        chars = self.id_to_token[tokens]
+        word_texts = ["".join(w) for w in np.split(chars, first[1:])]
+
+        starts = time_offset + start_frames * self.frame_duration
+        ends = time_offset + (end_frames + 1) * self.frame_duration
+        probs = np.exp(word_logp)
+
+        words = [
+            {
+                'word': f" {text}",
+                'start': round(float(s), 2),
+                'end': round(float(e), 2),
+                'probability': float(p)
+            }
+            for text, s, e, p in zip(word_texts, starts, ends, probs)
+        ]
+        text = " ".join(word_texts)
+
+        # Split into segments at pauses longer than max_pause
+        breaks = np.flatnonzero(starts[1:] - ends[:-1] > self.max_pause) + 1
+        seg_first = np.concatenate(([0], breaks))
+        seg_last = np.append(breaks, len(words)) - 1
+        seg_logp = (np.add.reduceat(word_logp_sum, seg_first)
+                    / np.add.reduceat(word_len, seg_first))
+
+        segments = []
+        for i, (a, b) in enumerate(zip(seg_first, seg_last)):
+            seg_words = words[a:b + 1]
+            seg_text = "".join(w['word'] for w in seg_words)
+            text_bytes = seg_text.encode("utf-8")
+            segments.append({
+                'id': i,
+                'seek': 0,
+                'start': seg_words[0]['start'],
+                'end': seg_words[-1]['end'],
+                'text': seg_text,
+                'tokens': tokens[first[a]:last[b] + 1].tolist(),
+                'temperature': 0.0,
+                'avg_logprob': float(seg_logp[i]),
+                'compression_ratio': len(text_bytes) / len(zlib.compress(text_bytes)),
+                'no_speech_prob': 0.0,
+                'words': seg_words
+            })
+        return {'text': text, 'segments': segments}
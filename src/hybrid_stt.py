@@ -1,43 +1,84 @@
 import sys
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import yaml
 import numpy as np
 
 # Import both STT engines
 from .whisper_stt import WhisperSTT
 from .indic_stt import IndicSTT
+from .config import as_config, configure_torch, resolve_device
+from .model_pool import ModelPool, whisper_estimate_mb
+from .profiling import RequestProfiler
 
 
 class HybridSTT:
     """Hybrid STT combining Whisper (en, ar) and IndicSTT (ml)"""
     
-    def __init__(self, config_path="config/config.yaml"):
-        """Initialize hybrid STT system"""
-        # Load config
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+    def __init__(self, config="config/config.yaml"):
+        """
+        Initialize hybrid STT system
+        
+        Args:
+            config: Shared Config object, or path to config.yaml
+        """
+        # Parsed and validated once, shared by every engine
+        self.config = as_config(config)
+        configure_torch(self.config)
         
         print("=== Initializing Hybrid STT System ===")
         
-        # Initialize Whisper for English & Arabic
-        print("\n1. Loading Whisper STT...")
-        self.whisper = WhisperSTT(config_path)
+        # Engines are resolved through the pool on every request
+        indic_config = self.config.indic
+        pool_config = self.config.model_pool
         
-        # Initialize IndicSTT for Malayalam
-        print("\n2. Loading IndicSTT for Malayalam...")
-        indic_config = self.config['indic']
-        self.indic = IndicSTT(
-            model_path=indic_config['model_name'],
-            device=indic_config['device']
+        self.whisper_size = self.config.model.size
+        self.indic_models = indic_config.language_models
+        
+        self.pool = ModelPool(memory_budget_mb=pool_config.memory_budget_mb)
+        self.pool.register(
+            'whisper',
+            lambda size, language: WhisperSTT(self.config, model_size=size),
+            estimate=lambda size, language: whisper_estimate_mb(size)
+        )
+        self.pool.register(
+            'indic',
+            lambda size, language: IndicSTT(
+                model_path=self.indic_models[language],
+                device=resolve_device(indic_config.device),
+                language=language,
+                max_pause=indic_config.max_pause,
+                quantization=self.config.performance.quantization
+            )
         )
         
-        # Language detection settings
-        self.auto_detect = self.config['language_detection']['enabled']
-        self.supported_langs = self.config['language_detection']['supported_languages']
+        if pool_config.preload:
+            print("\n1. Loading Whisper STT...")
+            with self.pool.lease('whisper', self.whisper_size):
+                pass
+            print("\n2. Loading IndicSTT...")
+            for language in self.indic_models:
+                with self.pool.lease('indic', language=language):
+                    pass
+        
+        # Languages Whisper is expected to see (model.language is checked against it)
+        self.supported_langs = self.config.language_detection.supported_languages
         
         self.current_engine = 'whisper'  # Default
+        self._state_lock = threading.Lock()
+        
+        # Async API: inference runs on a managed executor, created lazily
+        self.max_concurrency = self.config.concurrency.max_concurrency
+        self.request_timeout = self.config.concurrency.timeout
+        self._executor = None
+        self._slots = None
         
-    def transcribe(self, audio_path=None, audio_array=None, sample_rate=16000):
+        self.profiler = RequestProfiler(self.config.profiling)
+        
+    def transcribe(self, audio_path=None, audio_array=None, sample_rate=16000,
+                   whisper_size=None, profile=None):
         """
         Transcribe audio using appropriate engine (auto-detect only)
         
@@ -45,38 +86,201 @@ class HybridSTT:
             audio_path: Path to audio file
             audio_array: Numpy array of audio
             sample_rate: Audio sample rate
+            whisper_size: Whisper model size for this request (defaults to config)
+            profile: True/False to force profiling on/off for this request;
+                None follows the profiling section of the config
             
         Returns:
             dict with 'text', 'language', 'engine' keys
         """
+        with self.profiler.capture(profile) as tags:
+            result = self._transcribe(audio_path, audio_array, sample_rate, whisper_size)
+            if tags is not None:
+                tags.update(
+                    engine=result['engine'],
+                    language=result['language'],
+                    whisper_size=whisper_size or self.whisper_size,
+                    audio_path=str(audio_path) if audio_path else None,
+                    audio_samples=None if audio_array is None else len(audio_array),
+                    sample_rate=sample_rate
+                )
+        return result
+    
+    def _transcribe(self, audio_path, audio_array, sample_rate, whisper_size):
+        """Route one request through Whisper and, if needed, IndicSTT"""
         # Step 1: Run Whisper (Fast Check)
-        if audio_path:
-            whisper_result = self.whisper.transcribe_file(audio_path)
-        else:
-            whisper_result = self.whisper.transcribe_array(audio_array)
+        with self.pool.lease('whisper', whisper_size or self.whisper_size) as whisper_engine:
+            if audio_path:
+                whisper_result = whisper_engine.transcribe_file(audio_path)
+            else:
+                whisper_result = whisper_engine.transcribe_array(audio_array)
         
         detected_lang = whisper_result.get('language', 'en')
         
-        # Step 2: If Whisper detects Malayalam, route to IndicSTT
-        if detected_lang == 'ml':
-            print(f"Detected Malayalam: Routing to IndicSTT...")
-            indic_result = self.indic.transcribe(
-                audio_path=audio_path,
-                audio_array=audio_array,
-                sample_rate=sample_rate
-            )
+        # Nothing to hand to IndicSTT if Whisper found only silence
+        if whisper_result.get('decoding') == 'no_speech':
+            whisper_result['engine'] = 'whisper'
+            with self._state_lock:
+                self.current_engine = 'whisper'
+            return whisper_result
+        
+        # Step 2: If an Indic model covers the language, route to IndicSTT
+        if detected_lang in self.indic_models:
+            print(f"Detected {detected_lang}: Routing to IndicSTT...")
+            with self.pool.lease('indic', language=detected_lang) as indic_engine:
+                indic_result = indic_engine.transcribe(
+                    audio_path=audio_path,
+                    audio_array=audio_array,
+                    sample_rate=sample_rate
+                )
             indic_result['engine'] = 'indic'
-            self.current_engine = 'indic'
+            with self._state_lock:
+                self.current_engine = 'indic'
             return indic_result
         
         # Step 3: Otherwise, return Whisper's result
         else:
             print(f"Detected {detected_lang}: Keeping Whisper Output.")
             whisper_result['engine'] = 'whisper'
-            self.current_engine = 'whisper'
+            with self._state_lock:
+                self.current_engine = 'whisper'
             return whisper_result
     
     def get_current_engine(self):
-        """Get currently active engine"""
-        return self.current_engine
-
+        """Get the engine used by the most recently completed request"""
+        with self._state_lock:
+            return self.current_engine
+    
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="hybrid-stt"
+            )
+        return self._executor
+    
+    async def _run_in_slot(self, func, timeout):
+        """
+        Run func on the executor once an inference slot is free
+        
+        The slot stays held until func returns, even if the caller times
+        out or is cancelled, so the concurrency limit is never exceeded.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        timeout = timeout if timeout is not None else self.request_timeout
+        
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._get_executor(), func)
+        except BaseException:
+            self._slots.release()
+            raise
+        
+        def done(fut):
+            self._slots.release()
+            # Retrieve the error so an abandoned future is not logged as
+            # "exception was never retrieved"; awaiting callers still get it
+            if not fut.cancelled():
+                fut.exception()
+        
+        future.add_done_callback(done)
+        
+        # shield: a cancelled caller must not mark the slot free early
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    
+    async def atranscribe(self, audio_path=None, audio_array=None, sample_rate=16000,
+                          whisper_size=None, timeout=None, profile=None):
+        """
+        Async version of transcribe
+        
+        Waits for a free inference slot (backpressure), then runs transcribe
+        on the managed executor. Each pooled engine serves one request at a
+        time, so with max_concurrency > 1 requests overlap across engines
+        (e.g. one in Whisper while another is in IndicSTT). On cancellation or timeout the
+        caller is released immediately; the slot is freed once the running
+        inference finishes, so the concurrency limit is never exceeded.
+        
+        Args:
+            audio_path: Path to audio file
+            audio_array: Numpy array of audio
+            sample_rate: Audio sample rate
+            whisper_size: Whisper model size for this request (defaults to config)
+            timeout: Seconds before asyncio.TimeoutError (defaults to config)
+            profile: Force profiling on/off for this request
+            
+        Returns:
+            dict with 'text', 'language', 'engine' keys
+        """
+        return await self._run_in_slot(
+            functools.partial(
+                self.transcribe,
+                audio_path=audio_path,
+                audio_array=audio_array,
+                sample_rate=sample_rate,
+                whisper_size=whisper_size,
+                profile=profile
+            ),
+            timeout
+        )
+    
+    async def astream(self, chunks, sample_rate=16000, timeout=None, incremental=False,
+                      whisper_size=None):
+        """
+        Transcribe an async iterable of audio arrays
+        
+        Yields one result per chunk, in order. The next chunk is not pulled
+        until the previous one is transcribed, so slow inference throttles
+        the producer.
+        
+        With incremental=True the chunks are treated as one continuous
+        16 kHz stream: each result is Whisper's transcription of the latest
+        streaming.window_seconds of audio, built from an incremental mel
+        buffer owned by this call (no IndicSTT routing). The Whisper model
+        is leased for the whole stream so it cannot be evicted mid-stream.
+        """
+        if incremental:
+            async for result in self._astream_incremental(chunks, sample_rate, timeout, whisper_size):
+                yield result
+            return
+        
+        async for chunk in chunks:
+            yield await self.atranscribe(
+                audio_array=chunk,
+                sample_rate=sample_rate,
+                whisper_size=whisper_size,
+                timeout=timeout
+            )
+    
+    async def _astream_incremental(self, chunks, sample_rate, timeout, whisper_size):
+        if sample_rate != 16000:
+            raise ValueError("incremental streaming expects 16 kHz audio")
+        size = whisper_size or self.whisper_size
+        
+        # Pin the engine (loading it if needed) without locking it; each
+        # update then takes the engine's inference lock through lease()
+        loop = asyncio.get_running_loop()
+        engine = await loop.run_in_executor(
+            self._get_executor(), self.pool.acquire, 'whisper', size
+        )
+        try:
+            stream = engine.open_stream()
+            async for chunk in chunks:
+                yield await self._run_in_slot(
+                    functools.partial(self._stream_update, stream, size, chunk), timeout
+                )
+        finally:
+            self.pool.release('whisper', size)
+    
+    def _stream_update(self, stream, size, chunk):
+        with self.pool.lease('whisper', size):
+            result = stream.transcribe(chunk)
+        result['engine'] = 'whisper'
+        return result
+    
+    def close(self, wait=True):
+        """Shut down the async executor, by default waiting for running requests"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -1,18 +1,25 @@
 import torch
+from torch.profiler import record_function
 from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
 import numpy as np
 import librosa
 
+from .config import DEFAULT_INDIC_MODEL
+from .ctc_decoder import GreedyCTCDecoder
+from .quantization import quantize_int8
+
 
 class IndicSTT:
     """Malayalam speech recognition using Wav2Vec2"""
     
-    def __init__(self, model_path=None, device="cuda"):
-        """Initialize Malayalam STT model"""
+    def __init__(self, model_path=None, device="cuda", language="ml", max_pause=0.5,
+                 quantization="none"):
+        """Initialize Malayalam STT model (max_pause: word gap in seconds that starts a new segment)"""
         self.device = device if torch.cuda.is_available() else "cpu"
+        self.language = language
         
-        # Use public Malayalam model
-        model_name = "gvs/wav2vec2-large-xlsr-malayalam"
+        # Default to the public Malayalam model
+        model_name = model_path or DEFAULT_INDIC_MODEL
         
         print(f"Loading Malayalam STT model: {model_name}")
         print(f"Using device: {self.device}")
@@ -20,6 +27,12 @@ class IndicSTT:
         # Load processor and model
         self.processor = Wav2Vec2Processor.from_pretrained(model_name)
         self.model = Wav2Vec2ForCTC.from_pretrained(model_name).to(self.device)
+        if quantization == "int8":
+            self.model = quantize_int8(self.model)
+        
+        # Each logit frame covers inputs_to_logits_ratio samples (320 → 20 ms)
+        frame_duration = self.model.config.inputs_to_logits_ratio / 16000
+        self.decoder = GreedyCTCDecoder(self.processor.tokenizer, frame_duration, max_pause)
         
         print("Malayalam STT model loaded successfully!")
     
@@ -33,35 +46,39 @@ class IndicSTT:
             sample_rate: Sample rate of audio
             
         Returns:
-            dict with 'text' and 'language' keys
+            dict with 'text', 'segments' and 'language' keys. Segments follow
+            Whisper's schema, including per-word 'start', 'end' and 'probability'.
         """
         # Load audio
-        if audio_path:
-            audio, sr = librosa.load(audio_path, sr=16000)
-        elif audio_array is not None:
-            audio = audio_array
-            if sample_rate != 16000:
-                audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=16000)
-        else:
-            raise ValueError("Either audio_path or audio_array must be provided")
+        with record_function("indic.load_audio"):
+            if audio_path:
+                audio, sr = librosa.load(audio_path, sr=16000)
+            elif audio_array is not None:
+                audio = audio_array
+                if sample_rate != 16000:
+                    audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=16000)
+            else:
+                raise ValueError("Either audio_path or audio_array must be provided")
         
         # Process audio
-        inputs = self.processor(audio, sampling_rate=16000, return_tensors="pt", padding=True)
+        with record_function("indic.feature_extractor"):
+            inputs = self.processor(audio, sampling_rate=16000, return_tensors="pt", padding=True)
         
         # Move to device
         input_values = inputs.input_values.to(self.device)
         
         # Transcribe
-        with torch.no_grad():
+        with torch.no_grad(), record_function("indic.forward"):
             logits = self.model(input_values).logits
         
         # Decode
-        predicted_ids = torch.argmax(logits, dim=-1)
-        transcription = self.processor.batch_decode(predicted_ids)[0]
+        with record_function("indic.ctc_decode"):
+            decoded = self.decoder.decode(logits)[0]
         
         return {
-            'text': transcription,
-            'language': 'ml'
+            'text': decoded['text'],
+            'segments': decoded['segments'],
+            'language': self.language
         }
     
     def transcribe_stream(self, audio_chunk, sample_rate=16000):
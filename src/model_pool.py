@@ -0,0 +1,183 @@
+import gc
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import torch
+
+from .quantization import packed_weight_bytes
+
+
+# Rough fp32 footprints (MB) used to make room before a model is loaded
+WHISPER_SIZE_MB = {
+    'tiny': 150,
+    'base': 290,
+    'small': 970,
+    'medium': 3060,
+    'large': 6170,
+}
+DEFAULT_ESTIMATE_MB = 1300
+
+
+def whisper_estimate_mb(size):
+    """Expected footprint of a Whisper size ('small', 'medium.en', 'large-v3', ...)"""
+    base = size.split('.')[0].split('-')[0]
+    return WHISPER_SIZE_MB.get(base, DEFAULT_ESTIMATE_MB)
+
+
+def model_memory_mb(engine):
+    """Parameter, buffer and int8 packed-weight memory of an engine's model, in MB"""
+    model = engine.model
+    tensors = list(model.parameters()) + list(model.buffers())
+    size = sum(t.numel() * t.element_size() for t in tensors)
+    return (size + packed_weight_bytes(model)) / 2**20
+
+
+class _Entry:
+    def __init__(self, engine, memory_mb):
+        self.engine = engine
+        self.memory_mb = memory_mb
+        self.leases = 0
+        # Set once the loader has finished (successfully or not)
+        self.ready = threading.Event()
+        self.error = None
+        # Engines are not re-entrant (Whisper installs kv-cache hooks on its
+        # shared decoder per decode), so inference on one engine is serialized
+        self.inference_lock = threading.Lock()
+
+
+class ModelPool:
+    """
+    On-demand engine registry with a memory budget and LRU eviction
+
+    Engines are keyed by (family, size, language) and created by the loader
+    registered for their family, outside the pool lock, so a slow load
+    never blocks requests for engines that are already resident. Waiters
+    for the same key share one load. ``lease`` also serializes use of each
+    engine, so different engines can run concurrently but one engine never
+    runs two requests at once. Leased engines are never evicted; if the
+    budget cannot be met without evicting a leased engine the pool goes
+    over budget rather than failing the request.
+    """
+
+    def __init__(self, memory_budget_mb=4096):
+        self.memory_budget_mb = memory_budget_mb
+        self._loaders = {}
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def register(self, family, loader, estimate=None):
+        """
+        Register a loader for an engine family
+
+        Args:
+            family: Family name, e.g. 'whisper' or 'indic'
+            loader: Callable (size, language) -> engine with a .model attribute
+            estimate: Callable (size, language) -> expected MB (optional)
+        """
+        self._loaders[family] = (loader, estimate)
+
+    @property
+    def used_mb(self):
+        return sum(entry.memory_mb for entry in self._entries.values())
+
+    def loaded(self):
+        """Keys of resident engines, least recently used first"""
+        return list(self._entries)
+
+    def _evict(self, needed_mb):
+        freed = False
+        for key in list(self._entries):
+            if self.used_mb + needed_mb <= self.memory_budget_mb:
+                break
+            entry = self._entries[key]
+            if entry.leases:
+                continue
+            print(f"Evicting {key} ({entry.memory_mb:.0f} MB)")
+            del self._entries[key]
+            freed = True
+
+        if freed:
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+    def acquire(self, family, size=None, language=None):
+        """
+        Return a leased engine, loading it if needed. Pair with release().
+
+        The engine is kept resident but not locked; use ``lease`` to also
+        get exclusive use of it.
+        """
+        return self._acquire_entry(family, size, language).engine
+
+    def _acquire_entry(self, family, size, language):
+        key = (family, size, language)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.leases += 1
+                loading = False
+            else:
+                if family not in self._loaders:
+                    raise KeyError(f"No loader registered for family '{family}'")
+                loader, estimate = self._loaders[family]
+
+                # Reserve the key and its estimated memory; the load itself
+                # runs outside the lock so resident engines stay usable
+                expected = estimate(size, language) if estimate else DEFAULT_ESTIMATE_MB
+                self._evict(expected)
+                entry = _Entry(None, expected)
+                entry.leases += 1
+                self._entries[key] = entry
+                loading = True
+
+        if not loading:
+            entry.ready.wait()
+            if entry.error is not None:
+                raise RuntimeError(f"Loading {key} failed") from entry.error
+            return entry
+
+        try:
+            engine = loader(size, language)
+        except BaseException as e:
+            with self._lock:
+                del self._entries[key]
+            entry.error = e
+            entry.ready.set()
+            raise
+
+        with self._lock:
+            entry.engine = engine
+            entry.memory_mb = model_memory_mb(engine)
+            # The estimate may have been low; settle with the real size
+            self._evict(0)
+            if self.used_mb > self.memory_budget_mb:
+                print(f"Warning: model pool over budget "
+                      f"({self.used_mb:.0f}/{self.memory_budget_mb} MB), "
+                      f"all other models are leased")
+        entry.ready.set()
+        return entry
+
+    def release(self, family, size=None, language=None):
+        """Return a lease taken with acquire()"""
+        with self._lock:
+            entry = self._entries[(family, size, language)]
+            entry.leases -= 1
+
+    @contextmanager
+    def lease(self, family, size=None, language=None):
+        """
+        Context manager holding an engine resident and exclusively in use
+
+        Example:
+            with pool.lease('whisper', 'tiny') as engine:
+                engine.transcribe_array(audio)
+        """
+        entry = self._acquire_entry(family, size, language)
+        try:
+            with entry.inference_lock:
+                yield entry.engine
+        finally:
+            self.release(family, size, language)
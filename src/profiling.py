@@ -0,0 +1,224 @@
+import os
+import sys
+import json
+import time
+import random
+import itertools
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import librosa
+import torch
+from torch.profiler import record_function
+
+
+class StackSampler:
+    """
+    Low-overhead sampling profiler for one Python thread
+
+    Samples the target thread's stack every ``interval`` seconds from a
+    background thread and aggregates them as collapsed stacks, the format
+    read by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write_folded(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def top_ops(events, thread, limit=20):
+    """
+    Torch ops recorded on one thread, by self CPU time
+
+    torch.profiler records every thread in the process, so with concurrent
+    requests prof.key_averages() would mix in other requests' ops.
+    """
+    totals = {}
+    for event in events:
+        # Python call-site events (with_stack) only exist on newer torch
+        if event.thread != thread or getattr(event, 'is_python_function', False):
+            continue
+        entry = totals.setdefault(event.name, {'name': event.name, 'calls': 0,
+                                               'self_cpu_ms': 0.0, 'cpu_total_ms': 0.0})
+        entry['calls'] += 1
+        entry['self_cpu_ms'] += event.self_cpu_time_total / 1000
+        entry['cpu_total_ms'] += event.cpu_time_total / 1000
+    ops = sorted(totals.values(), key=lambda op: op['self_cpu_ms'], reverse=True)
+    return ops[:limit]
+
+
+def filter_trace(path, pid, tid):
+    """Drop host events of other threads from an exported Chrome trace"""
+    with open(path) as f:
+        trace = json.load(f)
+    trace['traceEvents'] = [
+        event for event in trace['traceEvents']
+        if event.get('ph') == 'M'
+        or event.get('pid') != pid
+        or not isinstance(event.get('tid'), int)
+        or event['tid'] == tid
+    ]
+    with open(path, 'w') as f:
+        json.dump(trace, f)
+
+
+def audio_duration(audio_path=None, num_samples=None, sample_rate=16000):
+    """Duration in seconds of a request's audio (file path or sample count)"""
+    if audio_path:
+        return librosa.get_duration(path=str(audio_path))
+    if num_samples is not None:
+        return num_samples / sample_rate
+    return 0.0
+
+
+class RequestProfiler:
+    """
+    Opt-in per-request profiling
+
+    A profiled request runs under torch.profiler (Chrome trace) and a
+    StackSampler (folded Python stacks). Artifacts are written to
+    ``output_dir`` named after time, a per-process counter, engine, audio
+    file and duration, with a JSON sidecar of tags and the top torch ops.
+
+    Only the profiled request's thread is kept in the trace and op table;
+    the sidecar records how many requests were in flight meanwhile, since
+    their work still competes for the same cores.
+    """
+
+    def __init__(self, config):
+        """
+        Args:
+            config: ProfilingConfig
+        """
+        self.config = config
+        # torch.profiler is process-global; profile one request at a time
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        # Requests inside capture(), and the most seen while one is profiled
+        self._state = threading.Lock()
+        self._active = 0
+        self._peak = None
+
+    def should_profile(self, profile=None):
+        """Per-call flag wins; otherwise sample at config.sample_rate when enabled"""
+        if profile is not None:
+            return profile
+        return self.config.enabled and random.random() < self.config.sample_rate
+
+    @contextmanager
+    def capture(self, profile=None):
+        """
+        Profile the enclosed block if selected
+
+        Yields a dict of tags for the caller to fill in ('engine',
+        'audio_path' or 'audio_samples', 'sample_rate', ...), or None when
+        the request is not profiled or another request is already being
+        profiled. The audio duration is measured after profiling stops so
+        it does not show up in the trace.
+        """
+        with self._state:
+            self._active += 1
+            if self._peak is not None:
+                self._peak = max(self._peak, self._active)
+        try:
+            if not self.should_profile(profile) or not self._lock.acquire(blocking=False):
+                yield None
+                return
+            try:
+                with self._profiled() as tags:
+                    yield tags
+            finally:
+                self._lock.release()
+        finally:
+            with self._state:
+                self._active -= 1
+
+    @contextmanager
+    def _profiled(self):
+        tags = {}
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+
+        with self._state:
+            self._peak = self._active
+        sampler = StackSampler(threading.get_ident(), self.config.python_interval_ms / 1000)
+        start = time.perf_counter()
+        try:
+            with torch.profiler.profile(activities=activities, with_stack=True) as prof:
+                sampler.start()
+                try:
+                    # Marks this thread's events among those of concurrent requests
+                    with record_function("request"):
+                        yield tags
+                finally:
+                    sampler.stop()
+        finally:
+            with self._state:
+                tags['concurrent_requests'] = self._peak
+                self._peak = None
+        tags['wall_time'] = time.perf_counter() - start
+        tags['thread_id'] = threading.get_native_id()
+        tags['audio_duration'] = audio_duration(
+            tags.get('audio_path'), tags.get('audio_samples'), tags.get('sample_rate', 16000)
+        )
+        self._write(prof, sampler, tags)
+
+    def _write(self, prof, sampler, tags):
+        out_dir = Path(self.config.output_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        # The counter and pid keep names unique within the same second
+        stem = Path(tags['audio_path']).stem if tags.get('audio_path') else "array"
+        name = "{}_{}_{:04d}_{}_{}_{:.1f}s".format(
+            time.strftime("%Y%m%d-%H%M%S"),
+            os.getpid(),
+            next(self._counter),
+            tags.get('engine', 'unknown'),
+            stem,
+            tags['audio_duration']
+        )
+        base = out_dir / name
+
+        prof.export_chrome_trace(f"{base}.trace.json")
+        filter_trace(f"{base}.trace.json", os.getpid(), tags['thread_id'])
+        sampler.write_folded(f"{base}.folded")
+
+        events = prof.events()
+        marker = next(event for event in events if event.name == "request")
+        tags['python_samples'] = sum(sampler.stacks.values())
+        tags['top_ops'] = top_ops(events, marker.thread)
+        with open(f"{base}.json", 'w') as f:
+            json.dump(tags, f, indent=2, default=str)
+
+        print(f"Profile written: {base}.trace.json")
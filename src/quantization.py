@@ -0,0 +1,41 @@
+import torch
+from torch import nn
+
+
+def quantize_int8(model, linear_subclasses=()):
+    """
+    Dynamic int8 quantization of a model's Linear layers (CPU only)
+
+    quantize_dynamic matches module types exactly, so Linear subclasses
+    listed in ``linear_subclasses`` (e.g. whisper.model.Linear, whose
+    forward only casts weights to the input dtype) are rebound to
+    nn.Linear first.
+
+    Raises:
+        RuntimeError: if no layer was converted
+    """
+    if linear_subclasses:
+        for module in model.modules():
+            if type(module) in linear_subclasses:
+                module.__class__ = nn.Linear
+
+    quantized = torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+    converted = sum(
+        isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in quantized.modules()
+    )
+    if converted == 0:
+        raise RuntimeError("int8 quantization did not convert any Linear layers")
+    return quantized
+
+
+def packed_weight_bytes(model):
+    """Bytes held by dynamically quantized Linear weights, which parameters() misses"""
+    total = 0
+    for module in model.modules():
+        if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+            weight, bias = module._packed_params._weight_bias()
+            total += weight.numel() * weight.element_size()
+            if bias is not None:
+                total += bias.numel() * bias.element_size()
+    return total
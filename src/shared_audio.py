@@ -0,0 +1,252 @@
+import time
+import multiprocessing as mp
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+AudioBlock = namedtuple("AudioBlock", ["seq", "timestamp", "samples"])
+
+
+class SharedAudioBuffer:
+    """
+    Lock-free single-writer ring buffer of audio blocks in shared memory
+
+    Layout of the shared block:
+        header      int64[5]                  write_seq, num_blocks, block_size, overflows, failed
+        seqs        int64[num_blocks]         sequence number stored in each slot
+        timestamps  float64[num_blocks]       capture time (time.time()) of each slot
+        lengths     int64[num_blocks]         valid samples in each slot
+        data        float32[num_blocks, block_size]
+
+    The writer marks a slot's seq as -1 before overwriting its samples and
+    publishes it by storing the real seq and bumping ``write_seq`` last.
+    Readers never start on the slot being written, and a block whose seq
+    changed while it was copied is rejected by ``is_valid``, so torn
+    samples are detected rather than returned. Lapped blocks are counted
+    in ``dropped``.
+    """
+
+    HEADER_FIELDS = 5
+
+    def __init__(self, name=None, num_blocks=256, block_size=1600, create=False):
+        """
+        Create or attach to a shared audio ring
+
+        Args:
+            name: Shared memory name (required when attaching)
+            num_blocks: Number of slots in the ring (create only)
+            block_size: Samples per slot (create only)
+            create: Allocate a new block instead of attaching
+        """
+        if create:
+            if num_blocks < 2:
+                raise ValueError("num_blocks must be at least 2")
+            size = self._nbytes(num_blocks, block_size)
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            if name is None:
+                raise ValueError("name is required to attach to an existing buffer")
+            self.shm = shared_memory.SharedMemory(name=name)
+            header = np.ndarray((self.HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+            num_blocks, block_size = int(header[1]), int(header[2])
+
+        self.name = self.shm.name
+        self.num_blocks = num_blocks
+        self.block_size = block_size
+        self.owner = create
+        self._map_arrays()
+
+        if create:
+            self._header[:] = [0, num_blocks, block_size, 0, 0]
+            self._seqs[:] = -1
+
+        # Reader state is local to each process
+        self._read_seq = int(self._header[0])
+        self.dropped = 0
+
+    @classmethod
+    def _nbytes(cls, num_blocks, block_size):
+        return 8 * cls.HEADER_FIELDS + 8 * 3 * num_blocks + 4 * num_blocks * block_size
+
+    def _map_arrays(self):
+        buf = self.shm.buf
+        n = self.num_blocks
+        offset = 8 * self.HEADER_FIELDS
+        self._header = np.ndarray((self.HEADER_FIELDS,), dtype=np.int64, buffer=buf)
+        self._seqs = np.ndarray((n,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += 8 * n
+        self._timestamps = np.ndarray((n,), dtype=np.float64, buffer=buf, offset=offset)
+        offset += 8 * n
+        self._lengths = np.ndarray((n,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += 8 * n
+        self._data = np.ndarray((n, self.block_size), dtype=np.float32, buffer=buf, offset=offset)
+
+    @property
+    def write_seq(self):
+        """Sequence number of the next block to be written"""
+        return int(self._header[0])
+
+    @property
+    def overflows(self):
+        """Input overflows reported by the capture stream"""
+        return int(self._header[3])
+
+    @property
+    def failed(self):
+        """True once the capture process has reported a fatal error"""
+        return bool(self._header[4])
+
+    def mark_failed(self):
+        """Flag a fatal capture error for the reader"""
+        self._header[4] = 1
+
+    def write(self, samples, timestamp=None):
+        """Publish one block of mono samples (writer side only)"""
+        seq = int(self._header[0])
+        slot = seq % self.num_blocks
+        n = min(len(samples), self.block_size)
+
+        # Invalidate the slot first so a concurrent copy of it fails is_valid
+        self._seqs[slot] = -1
+        self._data[slot, :n] = samples[:n]
+        self._lengths[slot] = n
+        self._timestamps[slot] = time.time() if timestamp is None else timestamp
+        self._seqs[slot] = seq
+        self._header[0] = seq + 1
+
+    def record_overflow(self):
+        """Count an input overflow reported by the audio driver"""
+        self._header[3] += 1
+
+    def read(self, max_blocks=None):
+        """
+        Return blocks published since the last read
+
+        The returned samples are views into shared memory (no copy). They stay
+        valid until the writer laps the ring; copy them, then check
+        ``is_valid`` before trusting the copy.
+
+        Args:
+            max_blocks: Upper bound on blocks returned (optional)
+
+        Returns:
+            list of AudioBlock(seq, timestamp, samples)
+        """
+        write_seq = int(self._header[0])
+        start = self._read_seq
+
+        # The oldest slot (write_seq - num_blocks) is the one being rewritten
+        oldest = write_seq - self.num_blocks + 1
+        if start < oldest:
+            self.dropped += oldest - start
+            start = oldest
+
+        end = write_seq if max_blocks is None else min(write_seq, start + max_blocks)
+
+        blocks = []
+        for seq in range(start, end):
+            slot = seq % self.num_blocks
+            if self._seqs[slot] != seq:
+                # Being written, or overwritten while we were reading
+                self.dropped += 1
+                continue
+            length = int(self._lengths[slot])
+            blocks.append(AudioBlock(seq, float(self._timestamps[slot]), self._data[slot, :length]))
+
+        self._read_seq = end
+        return blocks
+
+    def is_valid(self, block):
+        """Check that a block returned by ``read`` has not been overwritten"""
+        return self._seqs[block.seq % self.num_blocks] == block.seq
+
+    def close(self):
+        """Detach from shared memory, unlinking it if this side created it"""
+        # Drop numpy views before closing the mapping
+        self._header = self._seqs = self._timestamps = self._lengths = self._data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def run_capture(name, sample_rate, stop_event):
+    """
+    Capture process entry point
+
+    Opens a microphone stream and writes every callback block into the
+    shared ring until ``stop_event`` is set. The process is spawned, not
+    forked, so it starts without the parent's torch/CUDA/OpenMP threads
+    and never loads a model; its callback never waits on the parent's GIL.
+    Any failure (no input device, PortAudio missing) is flagged in the
+    ring header so the reader can report it.
+    """
+    ring = SharedAudioBuffer(name=name)
+
+    def callback(indata, frames, time_info, status):
+        if status and status.input_overflow:
+            ring.record_overflow()
+        ring.write(indata[:, 0])
+
+    try:
+        import sounddevice as sd
+
+        with sd.InputStream(
+            samplerate=sample_rate,
+            channels=1,
+            blocksize=ring.block_size,
+            callback=callback,
+            dtype=np.float32
+        ):
+            while not stop_event.wait(0.1):
+                pass
+    except BaseException:
+        ring.mark_failed()
+        raise
+    finally:
+        ring.close()
+
+
+class CaptureProcess:
+    """Run microphone capture in a dedicated process backed by SharedAudioBuffer"""
+
+    def __init__(self, sample_rate=16000, block_duration=0.1, buffer_duration=30):
+        self.sample_rate = sample_rate
+        block_size = int(sample_rate * block_duration)
+        num_blocks = max(2, int(buffer_duration / block_duration))
+        self.buffer = SharedAudioBuffer(num_blocks=num_blocks, block_size=block_size, create=True)
+        # Forking a process that already runs torch/OpenMP thread pools can deadlock
+        self._ctx = mp.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._process = None
+
+    def start(self):
+        """Spawn the capture process"""
+        self._stop_event.clear()
+        self._process = self._ctx.Process(
+            target=run_capture,
+            args=(self.buffer.name, self.sample_rate, self._stop_event),
+            daemon=True
+        )
+        self._process.start()
+
+    def stop(self, timeout=2.0):
+        """Stop the capture process and release shared memory"""
+        self._stop_event.set()
+        if self._process is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        self.buffer.close()
+
+    def is_alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def check(self):
+        """Raise RuntimeError if the capture process has failed or exited"""
+        if self.buffer.failed:
+            raise RuntimeError("Capture process failed to record audio (see its stderr)")
+        if self._process is not None and self._process.exitcode is not None:
+            raise RuntimeError(f"Capture process exited with code {self._process.exitcode}")
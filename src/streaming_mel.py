@@ -0,0 +1,113 @@
+import torch
+from whisper.audio import N_FFT, HOP_LENGTH, N_FRAMES, SAMPLE_RATE, mel_filters
+
+# log10 of the clamp floor; what Whisper's zero padding maps to
+LOG_FLOOR = -10.0
+
+
+class StreamingLogMel:
+    """
+    Incremental Whisper log-mel extractor for sliding-window decoding
+
+    Only the STFT frames covered by newly appended samples are computed.
+    Raw log10 mel frames are kept in a preallocated rolling buffer, and
+    the 30 s encoder input is assembled into a reused tensor, padded the
+    same way ``whisper.pad_or_trim`` + ``log_mel_spectrogram`` would.
+    """
+
+    def __init__(self, n_mels=80, window_seconds=30, device="cpu"):
+        """
+        Args:
+            n_mels: Mel bins expected by the model (model.dims.n_mels)
+            window_seconds: Audio kept in the decoding window (max 30)
+            device: Torch device for STFT and buffers
+        """
+        self.device = device
+        self.n_mels = n_mels
+        self.window_frames = min(N_FRAMES, int(window_seconds * SAMPLE_RATE / HOP_LENGTH))
+
+        self.window = torch.hann_window(N_FFT, device=device)
+        self.filters = mel_filters(device, n_mels)
+
+        # Twice the window so shifting back to the front is amortized O(1)
+        self._history = torch.full((n_mels, 2 * self.window_frames), LOG_FLOOR, device=device)
+        self._input = torch.empty((n_mels, N_FRAMES), device=device)
+        self.reset()
+
+    def reset(self):
+        """Forget all buffered audio"""
+        # Left context for the first frame, like center=True in Whisper's STFT
+        self._tail = torch.zeros(N_FFT // 2, device=self.device)
+        self._end = 0
+        self.total_frames = 0
+
+    @property
+    def duration(self):
+        """Seconds of audio consumed so far"""
+        return self.total_frames * HOP_LENGTH / SAMPLE_RATE
+
+    @property
+    def window_start(self):
+        """Stream time (seconds) of the first frame in the current window"""
+        return (self.total_frames - min(self._end, self.window_frames)) * HOP_LENGTH / SAMPLE_RATE
+
+    def append(self, samples):
+        """
+        Add new 16 kHz samples and compute only the frames they complete
+
+        Returns:
+            int: number of new mel frames
+        """
+        samples = torch.as_tensor(samples, dtype=torch.float32, device=self.device).flatten()
+        buf = torch.cat([self._tail, samples])
+
+        n = (len(buf) - N_FFT) // HOP_LENGTH + 1 if len(buf) >= N_FFT else 0
+        if n > 0:
+            stft = torch.stft(
+                buf[:(n - 1) * HOP_LENGTH + N_FFT],
+                N_FFT,
+                HOP_LENGTH,
+                window=self.window,
+                center=False,
+                return_complex=True
+            )
+            power = stft.abs() ** 2
+            mel = self.filters @ power
+            self._push(torch.clamp(mel, min=1e-10).log10())
+
+        self._tail = buf[n * HOP_LENGTH:]
+        return n
+
+    def _push(self, frames):
+        k = frames.shape[1]
+        w = self.window_frames
+        self.total_frames += k
+
+        if k >= w:
+            self._history[:, :w] = frames[:, -w:]
+            self._end = w
+            return
+
+        if self._end + k > self._history.shape[1]:
+            keep = w - k
+            self._history[:, :keep] = self._history[:, self._end - keep:self._end].clone()
+            self._end = keep
+
+        self._history[:, self._end:self._end + k] = frames
+        self._end += k
+
+    def features(self):
+        """
+        Normalized (n_mels, 3000) encoder input for the current window
+
+        The returned tensor is reused by the next call; consume it first.
+        """
+        n = min(self._end, self.window_frames)
+        mel = self._input
+        mel[:, :n] = self._history[:, self._end - n:self._end]
+        mel[:, n:] = LOG_FLOOR
+
+        # Same dynamic-range clamp and scaling as whisper.log_mel_spectrogram
+        mel.clamp_(min=float(mel.max()) - 8.0)
+        mel.add_(4.0).div_(4.0)
+        return mel
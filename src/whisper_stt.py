@@ -1,26 +1,38 @@
 import whisper
 import torch
-import yaml
+from torch.profiler import record_function
 from pathlib import Path
 
+from .config import as_config, configure_torch, resolve_device
+from .quantization import quantize_int8
+from .streaming_mel import StreamingLogMel
+
 class WhisperSTT:
     """
     Speech-to-Text engine using OpenAI Whisper
     """
     
-    def __init__(self, config_path="config/config.yaml"):
-        """Initialize Whisper model with config"""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+    def __init__(self, config="config/config.yaml", model_size=None):
+        """
+        Initialize Whisper model with config
+        
+        Args:
+            config: Shared Config object, or path to config.yaml
+            model_size: Whisper size to load (defaults to model.size in config)
+        """
+        self.config = as_config(config)
+        configure_torch(self.config)
         
-        model_config = self.config['model']
-        self.device = model_config['device'] if torch.cuda.is_available() else 'cpu'
+        self.device = resolve_device(self.config.model.device)
+        self.model_size = model_size or self.config.model.size
         
-        print(f"Loading Whisper '{model_config['size']}' model on {self.device}...")
+        print(f"Loading Whisper '{self.model_size}' model on {self.device}...")
         self.model = whisper.load_model(
-            model_config['size'], 
+            self.model_size, 
             device=self.device
         )
+        if self.config.performance.quantization == "int8":
+            self.model = quantize_int8(self.model, linear_subclasses=(whisper.model.Linear,))
         print("Model loaded successfully!")
     
     def transcribe_file(self, audio_path, language=None):
@@ -34,21 +46,10 @@ class WhisperSTT:
         Returns:
             dict: Transcription result with text, segments, and metadata
         """
-        language = language or self.config['model']['language']
-        
-        result = self.model.transcribe(
-            str(audio_path),
-            language=language,
-            fp16=self.config['performance']['fp16'] and self.device == 'cuda',
-            beam_size=self.config['performance']['beam_size'],
-            best_of=self.config['performance']['best_of']
-        )
-        
-        return {
-            'text': result['text'],
-            'segments': result['segments'],
-            'language': result['language']
-        }
+        # Decode once so an escalated pass does not re-run ffmpeg
+        with record_function("whisper.load_audio"):
+            audio = whisper.load_audio(str(audio_path))
+        return self._decode(audio, language)
     
     def transcribe_array(self, audio_array, language=None):
         """
@@ -59,15 +60,283 @@ class WhisperSTT:
             language: Language code (optional)
         
         Returns:
-            dict: Transcription result
+            dict: Transcription result with text, segments, and metadata
+        """
+        return self._decode(audio_array, language)
+    
+    @property
+    def _fp16(self):
+        return self.config.performance.fp16 and self.device == 'cuda'
+    
+    def _is_silent(self, no_speech_prob, avg_logprob):
+        """
+        No-speech gate, same rule as whisper.transcribe
+        
+        A window counts as silence when no_speech_prob is above the
+        threshold, unless the decode is confident anyway (avg_logprob above
+        logprob_threshold).
+        """
+        decoding = self.config.decoding
+        if no_speech_prob <= decoding.no_speech_threshold:
+            return False
+        return avg_logprob <= decoding.logprob_threshold
+    
+    def _passes(self, compression_ratio, avg_logprob):
+        """Quality check that decides whether to escalate"""
+        decoding = self.config.decoding
+        return (compression_ratio <= decoding.compression_ratio_threshold
+                and avg_logprob >= decoding.logprob_threshold)
+    
+    def _fallback_options(self, language):
+        """Escalation steps: beam search at temperature 0, sampling above it"""
+        performance = self.config.performance
+        for temperature in self.config.decoding.temperature_fallback:
+            if temperature == 0:
+                search = {'beam_size': performance.beam_size}
+            else:
+                search = {'best_of': performance.best_of}
+            yield whisper.DecodingOptions(
+                language=language, fp16=self._fp16, temperature=temperature, **search
+            )
+    
+    def _decode(self, audio, language=None):
         """
-        language = language or self.config['model']['language']
+        Decode audio with the configured fast-path policy
+        
+        A cheap greedy pass runs over the whole input first. Windows that
+        look like silence are dropped; only windows whose segments fail the
+        compression-ratio or log-prob thresholds are re-decoded with beam
+        search and temperature fallback, so one hard window in a long file
+        does not pay for the rest. With fast_path disabled Whisper's own
+        per-window fallback runs with beam search from the start.
+        """
+        language = language or self.config.model.language
+        decoding = self.config.decoding
+        performance = self.config.performance
+        
+        if not decoding.fast_path:
+            with record_function("whisper.beam_fallback"):
+                result = self.model.transcribe(
+                    audio,
+                    language=language,
+                    fp16=self._fp16,
+                    temperature=tuple(decoding.temperature_fallback),
+                    compression_ratio_threshold=decoding.compression_ratio_threshold,
+                    logprob_threshold=decoding.logprob_threshold,
+                    no_speech_threshold=decoding.no_speech_threshold,
+                    beam_size=performance.beam_size,
+                    best_of=performance.best_of
+                )
+            return {
+                'text': result['text'],
+                'segments': result['segments'],
+                'language': result['language'],
+                'decoding': 'beam'
+            }
+        
+        with record_function("whisper.greedy"):
+            result = self.model.transcribe(
+                audio,
+                language=language,
+                fp16=self._fp16,
+                temperature=0.0,
+                compression_ratio_threshold=None,
+                logprob_threshold=None,
+                no_speech_threshold=None
+            )
+        # Reuse the detected language instead of detecting again
+        language = language or result['language']
+        
+        # Group segments by the 30 s window (seek, in mel frames) they came from
+        windows = {}
+        for seg in result['segments']:
+            windows.setdefault(seg['seek'], []).append(seg)
+        seeks = list(windows)
+        
+        # Segments of one window share its no_speech_prob and avg_logprob
+        speech = [
+            seek for seek in seeks
+            if not self._is_silent(windows[seek][0]['no_speech_prob'], windows[seek][0]['avg_logprob'])
+        ]
+        if not speech:
+            return {
+                'text': '',
+                'segments': [],
+                'language': result['language'],
+                'decoding': 'no_speech'
+            }
+        
+        failing = [
+            seek for seek in speech
+            if not all(self._passes(seg['compression_ratio'], seg['avg_logprob'])
+                       for seg in windows[seek])
+        ]
         
-        result = self.model.transcribe(
-            audio_array,
-            language=language,
-            fp16=self.config['performance']['fp16'] and self.device == 'cuda'
+        if failing:
+            mel = whisper.log_mel_spectrogram(
+                audio, self.model.dims.n_mels, padding=whisper.audio.N_SAMPLES
+            ).to(self.device)
+            content_frames = mel.shape[-1] - whisper.audio.N_FRAMES
+            
+            ends = []
+            for seek in failing:
+                i = seeks.index(seek)
+                ends.append(seeks[i + 1] if i + 1 < len(seeks) else content_frames)
+            batch = torch.stack([
+                whisper.pad_or_trim(mel[:, seek:end], whisper.audio.N_FRAMES)
+                for seek, end in zip(failing, ends)
+            ])
+            
+            for seek, end, decoded in zip(failing, ends, self._escalate(batch, language)):
+                windows[seek] = [self._window_segment(decoded, seek, end)]
+        
+        segments = [seg for seek in speech for seg in windows[seek]]
+        for i, seg in enumerate(segments):
+            seg['id'] = i
+        
+        return {
+            'text': ''.join(seg['text'] for seg in segments),
+            'segments': segments,
+            'language': result['language'],
+            'decoding': 'beam' if failing else 'greedy'
+        }
+    
+    def _window_segment(self, result, seek, end):
+        """Whisper-style segment covering a re-decoded window [seek, end) in frames"""
+        frame = whisper.audio.HOP_LENGTH / whisper.audio.SAMPLE_RATE
+        return {
+            'id': 0,
+            'seek': seek,
+            'start': seek * frame,
+            'end': end * frame,
+            'text': ' ' + result.text,
+            'tokens': result.tokens,
+            'temperature': result.temperature,
+            'avg_logprob': result.avg_logprob,
+            'compression_ratio': result.compression_ratio,
+            'no_speech_prob': result.no_speech_prob
+        }
+    
+    def open_stream(self, language=None):
+        """
+        Start a sliding-window realtime stream
+        
+        Each stream owns its rolling mel buffer, so any number of streams can
+        share one engine. The engine itself is not re-entrant: callers that
+        share it across threads must serialize transcribe calls.
+        
+        Args:
+            language: Language code (optional)
+        
+        Returns:
+            WhisperStream: call transcribe(new_samples) with each new block
+        """
+        mel = StreamingLogMel(
+            n_mels=self.model.dims.n_mels,
+            window_seconds=self.config.streaming.window_seconds,
+            device=self.device
         )
+        return WhisperStream(self, mel, language)
+    
+    def _decode_mel(self, mel, language=None):
+        """Decode one 30 s mel window with the same fast-path policy as _decode"""
+        language = language or self.config.model.language
+        
+        if self.config.decoding.fast_path:
+            with record_function("whisper.greedy"):
+                result = whisper.decode(
+                    self.model, mel,
+                    whisper.DecodingOptions(language=language, fp16=self._fp16, temperature=0.0)
+                )
+            if self._is_silent(result.no_speech_prob, result.avg_logprob):
+                return result, 'no_speech'
+            if self._passes(result.compression_ratio, result.avg_logprob):
+                return result, 'greedy'
+            language = language or result.language
+        
+        return self._escalate(mel[None], language)[0], 'beam'
+    
+    def _escalate(self, mels, language):
+        """
+        Beam search, then temperature fallback, until each window passes
+        
+        Args:
+            mels: Tensor of 30 s mel windows, shape (n, n_mels, N_FRAMES)
+            language: Language code (None to detect per window)
+        
+        Returns:
+            list of DecodingResult, one per window
+        """
+        batch_size = self.config.performance.batch_size
+        results = [None] * len(mels)
+        pending = list(range(len(mels)))
         
-        return result
+        # Windows are decoded batch_size at a time; only the ones that still
+        # fail move on to the next fallback step
+        with record_function("whisper.beam_fallback"):
+            for options in self._fallback_options(language):
+                retry = []
+                for start in range(0, len(pending), batch_size):
+                    batch = pending[start:start + batch_size]
+                    for i, result in zip(batch, whisper.decode(self.model, mels[batch], options)):
+                        results[i] = result
+                        if not self._passes(result.compression_ratio, result.avg_logprob):
+                            retry.append(i)
+                pending = retry
+                if not pending:
+                    break
+        return results
 
+
+class WhisperStream:
+    """
+    One caller's sliding-window transcription state
+    
+    Holds the incremental mel buffer: only the new samples are turned into
+    mel frames and the encoder input is built from the rolling buffer, so
+    per-update feature cost scales with the new audio rather than the
+    window length. Created by WhisperSTT.open_stream().
+    """
+    
+    def __init__(self, engine, mel, language=None):
+        self.engine = engine
+        self.mel = mel
+        self.language = language
+    
+    def transcribe(self, new_samples):
+        """
+        Append new audio and transcribe the current window
+        
+        Args:
+            new_samples: 16 kHz samples received since the last call
+        
+        Returns:
+            dict: Transcription of the current window
+        """
+        with record_function("whisper.streaming_mel"):
+            self.mel.append(new_samples)
+            mel = self.mel.features()
+        result, path = self.engine._decode_mel(mel, self.language)
+        
+        text = '' if path == 'no_speech' else result.text
+        segment = {
+            'id': 0,
+            'start': round(self.mel.window_start, 2),
+            'end': round(self.mel.duration, 2),
+            'text': text,
+            'tokens': result.tokens,
+            'temperature': result.temperature,
+            'avg_logprob': result.avg_logprob,
+            'compression_ratio': result.compression_ratio,
+            'no_speech_prob': result.no_speech_prob
+        }
+        return {
+            'text': text,
+            'segments': [segment] if text else [],
+            'language': result.language,
+            'decoding': path
+        }
+    
+    def reset(self):
+        """Drop buffered audio, e.g. after a long pause"""
+        self.mel.reset()
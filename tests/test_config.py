@@ -0,0 +1,141 @@
+import pytest
+
+from src.config import Config, ConfigError, DEFAULT_INDIC_MODEL, as_config, load_config
+
+
+DEFAULT_PATH = "config/config.yaml"
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    def write(text):
+        path = tmp_path / "config.yaml"
+        path.write_text(text)
+        return str(path)
+    return write
+
+
+def test_default_file_loads():
+    config = load_config(DEFAULT_PATH, env={})
+
+    assert config.model.size == "small"
+    assert config.decoding.temperature_fallback[0] == 0.0
+    assert config.indic.language_models == {"ml": DEFAULT_INDIC_MODEL}
+
+
+def test_unknown_key_is_rejected(write_config):
+    path = write_config("model:\n  sise: tiny\n")
+    with pytest.raises(ConfigError, match="sise"):
+        load_config(path, env={})
+
+
+def test_unknown_section_is_rejected(write_config):
+    path = write_config("modle:\n  size: tiny\n")
+    with pytest.raises(ConfigError, match="modle"):
+        load_config(path, env={})
+
+
+def test_wrong_type_is_rejected(write_config):
+    path = write_config("performance:\n  beam_size: five\n")
+    with pytest.raises(ConfigError, match="performance.beam_size"):
+        load_config(path, env={})
+
+
+def test_env_overrides_are_typed():
+    env = {
+        "STT__MODEL__SIZE": "tiny",
+        "STT__PERFORMANCE__THREADS": "4",
+        "STT__DECODING__FAST_PATH": "false",
+        "STT__DECODING__TEMPERATURE_FALLBACK": "[0.0, 0.5]",
+        "PATH": "/usr/bin",
+    }
+    config = load_config(DEFAULT_PATH, env=env)
+
+    assert config.model.size == "tiny"
+    assert config.performance.threads == 4
+    assert config.decoding.fast_path is False
+    assert config.decoding.temperature_fallback == [0.0, 0.5]
+
+
+def test_env_string_fields_keep_raw_text():
+    env = {
+        "STT__MODEL__LANGUAGE": "no",
+        "STT__LANGUAGE_DETECTION__SUPPORTED_LANGUAGES": "[en, 'no']",
+    }
+    config = load_config(DEFAULT_PATH, env=env)
+
+    assert config.model.language == "no"
+
+
+def test_env_null_clears_optional_string():
+    config = load_config(DEFAULT_PATH, env={"STT__MODEL__LANGUAGE": "null"})
+    assert config.model.language is None
+
+
+def test_env_unknown_key_is_rejected():
+    with pytest.raises(ConfigError, match="sise"):
+        load_config(DEFAULT_PATH, env={"STT__MODEL__SISE": "tiny"})
+
+
+def test_env_wrong_type_is_rejected():
+    with pytest.raises(ConfigError, match="performance.threads"):
+        load_config(DEFAULT_PATH, env={"STT__PERFORMANCE__THREADS": "many"})
+
+
+def test_fp16_is_ignored_on_cpu():
+    config = load_config(DEFAULT_PATH, env={"STT__MODEL__DEVICE": "cpu"})
+
+    assert config.performance.fp16 is True
+    assert config.model.device == "cpu"
+
+
+def test_indic_models_and_model_name_conflict(write_config):
+    path = write_config(
+        "indic:\n"
+        "  model_name: some/model\n"
+        "  models:\n"
+        "    ml: other/model\n"
+    )
+    with pytest.raises(ConfigError, match="indic.models or indic.model_name"):
+        load_config(path, env={})
+
+
+def test_indic_models_map(write_config):
+    path = write_config("indic:\n  models:\n    ml: a/ml\n    ta: a/ta\n")
+    config = load_config(path, env={})
+
+    assert config.indic.language_models == {"ml": "a/ml", "ta": "a/ta"}
+
+
+@pytest.mark.parametrize("text, message", [
+    ("streaming:\n  window_seconds: 45\n", "window_seconds"),
+    ("performance:\n  quantization: int4\n", "quantization"),
+    ("model:\n  language: fr\n", "supported_languages"),
+    ("decoding:\n  temperature_fallback: []\n", "temperature_fallback"),
+    ("performance:\n  batch_size: 0\n", "batch_size"),
+    ("indic:\n  max_pause: 0\n", "max_pause"),
+    ("audio:\n  chunk_duration: -1\n", "chunk_duration"),
+    ("profiling:\n  sample_rate: 1.5\n", "profiling.sample_rate"),
+])
+def test_contradictions_are_rejected(write_config, text, message):
+    with pytest.raises(ConfigError, match=message):
+        load_config(write_config(text), env={})
+
+
+@pytest.mark.parametrize("text, key", [
+    ("language_detection:\n  enabled: true\n", "enabled"),
+    ("language_detection:\n  threshold: 0.8\n", "threshold"),
+    ("audio:\n  sample_rate: 44100\n", "sample_rate"),
+])
+def test_removed_keys_are_rejected(write_config, text, key):
+    with pytest.raises(ConfigError, match=key):
+        load_config(write_config(text), env={})
+
+
+def test_as_config_validates_config_objects():
+    config = Config()
+    assert as_config(config) is config
+
+    config.concurrency.max_concurrency = 0
+    with pytest.raises(ConfigError, match="max_concurrency"):
+        as_config(config)
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+import torch
+
+from src.ctc_decoder import GreedyCTCDecoder
+
+
+VOCAB = {"<pad>": 0, "<s>": 1, "</s>": 2, "<unk>": 3, "|": 4, "a": 5, "b": 6, "c": 7}
+BLANK, DELIM, A, B, C = 0, 4, 5, 6, 7
+FRAME = 0.02
+
+
+class StubTokenizer:
+    pad_token_id = BLANK
+    word_delimiter_token_id = DELIM
+    all_special_ids = [0, 1, 2, 3]
+
+    def get_vocab(self):
+        return dict(VOCAB)
+
+
+def make_logits(frames, probs):
+    """Logits whose argmax follows `frames`, with softmax prob `probs` on the winner"""
+    v = len(VOCAB)
+    dist = np.empty((len(frames), v))
+    for t, (idx, p) in enumerate(zip(frames, probs)):
+        dist[t] = (1 - p) / (v - 1)
+        dist[t, idx] = p
+    return torch.tensor(np.log(dist), dtype=torch.float32)
+
+
+@pytest.fixture
+def decoder():
+    return GreedyCTCDecoder(StubTokenizer(), FRAME)
+
+
+def test_words_text_and_timestamps(decoder):
+    frames = [A, A, BLANK, B, DELIM, DELIM, C, C, C, BLANK, BLANK]
+    logits = make_logits(frames, [0.9] * len(frames))[None]
+
+    (result,) = decoder.decode(logits)
+
+    assert result['text'] == "ab c"
+    words = result['segments'][0]['words']
+    assert [w['word'] for w in words] == [" ab", " c"]
+    # End covers the whole run of the last character, not just its first frame
+    assert words[0]['start'] == 0.0 and words[0]['end'] == pytest.approx(4 * FRAME)
+    assert words[1]['start'] == pytest.approx(6 * FRAME)
+    assert words[1]['end'] == pytest.approx(9 * FRAME)
+
+
+def test_confidence_ignores_blank_frames(decoder):
+    frames = [A, BLANK, BLANK, BLANK, B]
+    probs = [0.5, 0.99, 0.99, 0.99, 0.5]
+    (result,) = decoder.decode(make_logits(frames, probs)[None])
+
+    (word,) = result['segments'][0]['words']
+    assert word['probability'] == pytest.approx(0.5, abs=1e-5)
+    assert result['segments'][0]['avg_logprob'] == pytest.approx(np.log(0.5), abs=1e-5)
+
+
+def test_repeated_character_needs_blank(decoder):
+    frames = [A, A, BLANK, A, DELIM, B]
+    (result,) = decoder.decode(make_logits(frames, [0.9] * len(frames))[None])
+    assert result['text'] == "aa b"
+
+
+def test_special_tokens_are_not_emitted(decoder):
+    frames = [1, A, 3, B, 2]
+    (result,) = decoder.decode(make_logits(frames, [0.9] * len(frames))[None])
+    assert result['text'] == "ab"
+
+
+def test_batch_with_lengths(decoder):
+    first = make_logits([A, B, DELIM, C], [0.9] * 4)
+    second = make_logits([C, C, C, A], [0.9] * 4)
+    logits = torch.stack([first, second])
+
+    results = decoder.decode(logits, lengths=[4, 2])
+
+    assert results[0]['text'] == "ab c"
+    assert results[1]['text'] == "c"
+    # Run truncated at the padded length
+    assert results[1]['segments'][0]['end'] == pytest.approx(2 * FRAME)
+
+
+def test_silence_gives_no_segments(decoder):
+    (result,) = decoder.decode(make_logits([BLANK] * 5, [0.9] * 5)[None])
+    assert result == {'text': '', 'segments': []}
+
+
+def test_time_offset(decoder):
+    (result,) = decoder.decode(make_logits([BLANK, A], [0.9, 0.9])[None], time_offset=1.0)
+    word = result['segments'][0]['words'][0]
+    assert word['start'] == pytest.approx(1.0 + FRAME)
+
+
+def test_long_pause_starts_new_segment():
+    decoder = GreedyCTCDecoder(StubTokenizer(), FRAME, max_pause=0.1)
+    # "ab" | 2 blank frames (40 ms) | "c" | 10 blank frames (200 ms) | "b"
+    frames = [A, B, DELIM, BLANK, BLANK, C, DELIM] + [BLANK] * 10 + [B]
+    (result,) = decoder.decode(make_logits(frames, [0.9] * len(frames))[None])
+
+    first, second = result['segments']
+    assert result['text'] == "ab c b"
+    assert [first['id'], second['id']] == [0, 1]
+    assert first['text'] == " ab c" and second['text'] == " b"
+    assert [w['word'] for w in second['words']] == [" b"]
+    assert first['tokens'] == [A, B, C] and second['tokens'] == [B]
+    assert second['start'] == pytest.approx(17 * FRAME)
+
+
+def test_segments_have_whisper_keys(decoder):
+    frames = [A, B, DELIM, C]
+    (result,) = decoder.decode(make_logits(frames, [0.9] * len(frames))[None])
+
+    (segment,) = result['segments']
+    whisper_keys = {'id', 'seek', 'start', 'end', 'text', 'tokens', 'temperature',
+                    'avg_logprob', 'compression_ratio', 'no_speech_prob'}
+    assert whisper_keys <= set(segment)
+    assert segment['temperature'] == 0.0 and segment['no_speech_prob'] == 0.0
@@ -0,0 +1,211 @@
+import asyncio
+import gc
+import threading
+import time
+
+import pytest
+import torch
+
+from src.hybrid_stt import HybridSTT
+from src.model_pool import ModelPool
+
+
+def make_stt(transcribe, max_concurrency=1, timeout=None):
+    """HybridSTT with only the async machinery set up and a stubbed transcribe"""
+    stt = object.__new__(HybridSTT)
+    stt.max_concurrency = max_concurrency
+    stt.request_timeout = timeout
+    stt._executor = None
+    stt._slots = None
+    stt.transcribe = transcribe
+    return stt
+
+
+class BlockingTranscribe:
+    """transcribe stub that runs until released, then returns or raises"""
+
+    def __init__(self, error=None):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.error = error
+
+    def __call__(self, **kwargs):
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return {'text': 'done'}
+
+
+async def wait_for_free_slot(stt, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while stt._slots.locked():
+        assert time.monotonic() < deadline, "slot was never released"
+        await asyncio.sleep(0.01)
+
+
+def test_atranscribe_returns_result():
+    stt = make_stt(lambda **kwargs: {'text': kwargs['audio_path']})
+
+    result = asyncio.run(stt.atranscribe(audio_path="clip.wav"))
+
+    assert result == {'text': "clip.wav"}
+    stt.close()
+
+
+def test_timeout_holds_slot_until_worker_finishes():
+    transcribe = BlockingTranscribe()
+    stt = make_stt(transcribe)
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await stt.atranscribe(audio_array=[0.0], timeout=0.05)
+        # The inference thread is still running, so the slot is still taken
+        assert stt._slots.locked()
+        transcribe.release.set()
+        await wait_for_free_slot(stt)
+
+    asyncio.run(main())
+    stt.close()
+
+
+def test_cancellation_holds_slot_until_worker_finishes():
+    transcribe = BlockingTranscribe()
+    stt = make_stt(transcribe)
+
+    async def main():
+        task = asyncio.ensure_future(stt.atranscribe(audio_array=[0.0]))
+        while not transcribe.started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert stt._slots.locked()
+        transcribe.release.set()
+        await wait_for_free_slot(stt)
+
+    asyncio.run(main())
+    stt.close()
+
+
+def test_abandoned_error_is_not_logged():
+    transcribe = BlockingTranscribe(error=ValueError("decoder failed"))
+    stt = make_stt(transcribe)
+    reported = []
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: reported.append(context)
+        )
+        with pytest.raises(asyncio.TimeoutError):
+            await stt.atranscribe(audio_array=[0.0], timeout=0.05)
+        transcribe.release.set()
+        await wait_for_free_slot(stt)
+        await asyncio.sleep(0.01)
+        gc.collect()
+
+    asyncio.run(main())
+    stt.close()
+    assert reported == []
+
+
+def test_errors_reach_the_caller():
+    stt = make_stt(BlockingTranscribe(error=ValueError("decoder failed")))
+    stt.transcribe.release.set()
+
+    with pytest.raises(ValueError, match="decoder failed"):
+        asyncio.run(stt.atranscribe(audio_array=[0.0]))
+    stt.close()
+
+
+def test_backpressure_at_max_concurrency():
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def transcribe(**kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return {'text': kwargs['audio_path']}
+
+    stt = make_stt(transcribe, max_concurrency=2)
+
+    async def main():
+        return await asyncio.gather(*(stt.atranscribe(audio_path=str(i)) for i in range(6)))
+
+    results = asyncio.run(main())
+    stt.close()
+
+    assert [r['text'] for r in results] == [str(i) for i in range(6)]
+    assert peak[0] == 2
+
+
+def test_astream_yields_in_order():
+    def transcribe(**kwargs):
+        # Earlier chunks take longer; order must still follow the input
+        index = kwargs['audio_array'][0]
+        time.sleep(0.02 * (3 - index))
+        return {'text': str(index)}
+
+    stt = make_stt(transcribe, max_concurrency=2)
+
+    async def chunks():
+        for i in range(4):
+            yield [i]
+
+    async def main():
+        return [r['text'] async for r in stt.astream(chunks())]
+
+    assert asyncio.run(main()) == ["0", "1", "2", "3"]
+    stt.close()
+
+
+class FakeStream:
+    def __init__(self):
+        self.received = []
+
+    def transcribe(self, new_samples):
+        self.received.extend(new_samples)
+        return {'text': str(len(self.received))}
+
+
+class FakeWhisper:
+    def __init__(self):
+        self.model = torch.nn.Linear(4, 4)
+        self.streams = []
+
+    def open_stream(self, language=None):
+        self.streams.append(FakeStream())
+        return self.streams[-1]
+
+
+def test_incremental_astream_owns_its_stream():
+    stt = make_stt(None)
+    engine = FakeWhisper()
+    stt.whisper_size = 'tiny'
+    stt.pool = ModelPool(memory_budget_mb=10)
+    stt.pool.register('whisper', lambda size, language: engine)
+
+    async def chunks():
+        for i in range(3):
+            yield [0.0] * (i + 1)
+
+    async def main():
+        first = [r async for r in stt.astream(chunks(), incremental=True)]
+        second = [r async for r in stt.astream(chunks(), incremental=True)]
+        return first, second
+
+    first, second = asyncio.run(main())
+    stt.close()
+
+    # Each result transcribes everything received so far on that stream only
+    assert [r['text'] for r in first] == ["1", "3", "6"]
+    assert [r['text'] for r in second] == ["1", "3", "6"]
+    assert all(r['engine'] == 'whisper' for r in first)
+    assert len(engine.streams) == 2
+    # The stream's lease on the model is returned when the stream ends
+    assert stt.pool._entries[('whisper', 'tiny', None)].leases == 0
@@ -0,0 +1,181 @@
+import threading
+import time
+
+import pytest
+import torch
+
+from src.model_pool import ModelPool
+
+
+class FakeEngine:
+    """Engine whose model weighs `mb` megabytes of fp32 parameters"""
+
+    def __init__(self, key, mb):
+        self.key = key
+        self.model = torch.nn.Linear(int(mb * 2**20 / 4), 1, bias=False)
+
+
+def fake_pool(budget_mb=10, sizes=None, loads=None):
+    sizes = sizes or {}
+    pool = ModelPool(memory_budget_mb=budget_mb)
+
+    def loader(size, language):
+        if loads is not None:
+            loads.append((size, language))
+        return FakeEngine((size, language), sizes.get(size, 4))
+
+    pool.register('fake', loader, estimate=lambda size, language: sizes.get(size, 4))
+    return pool
+
+
+def test_lease_serializes_one_engine():
+    pool = fake_pool()
+    active = []
+    overlap = []
+
+    def worker():
+        with pool.lease('fake', 'a'):
+            active.append(1)
+            overlap.append(len(active))
+            time.sleep(0.05)
+            active.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert max(overlap) == 1
+
+
+def test_different_engines_run_concurrently():
+    pool = fake_pool()
+    both_inside = threading.Barrier(2, timeout=2)
+
+    def worker(size):
+        with pool.lease('fake', size):
+            both_inside.wait()
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in ('a', 'b')]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not both_inside.broken
+
+
+def test_engines_are_cached():
+    loads = []
+    pool = fake_pool(loads=loads)
+
+    first = pool.acquire('fake', 'a')
+    pool.release('fake', 'a')
+    second = pool.acquire('fake', 'a')
+    pool.release('fake', 'a')
+
+    assert first is second
+    assert loads == [('a', None)]
+
+
+def test_least_recently_used_is_evicted():
+    pool = fake_pool(budget_mb=10)
+
+    for size in ('a', 'b', 'a', 'c'):
+        with pool.lease('fake', size):
+            pass
+
+    # a (4) + b (4) + c (4) > 10: b was used least recently
+    assert pool.loaded() == [('fake', 'a', None), ('fake', 'c', None)]
+    assert pool.used_mb <= 10
+
+
+def test_leased_engine_is_never_evicted():
+    pool = fake_pool(budget_mb=6)
+
+    with pool.lease('fake', 'a'):
+        with pool.lease('fake', 'b'):
+            assert set(pool.loaded()) == {('fake', 'a', None), ('fake', 'b', None)}
+
+    with pool.lease('fake', 'c'):
+        pass
+    assert pool.loaded() == [('fake', 'c', None)]
+
+
+def test_unknown_family():
+    with pytest.raises(KeyError):
+        ModelPool().acquire('missing')
+
+
+def test_slow_load_does_not_block_resident_engines():
+    pool = ModelPool(memory_budget_mb=100)
+    started = threading.Event()
+    finish = threading.Event()
+
+    def loader(size, language):
+        if size == 'slow':
+            started.set()
+            finish.wait(5)
+        return FakeEngine(size, 1)
+
+    pool.register('fake', loader)
+    with pool.lease('fake', 'fast'):
+        pass
+
+    slow = threading.Thread(target=lambda: pool.acquire('fake', 'slow'))
+    slow.start()
+    assert started.wait(2)
+
+    begin = time.monotonic()
+    with pool.lease('fake', 'fast'):
+        pass
+    elapsed = time.monotonic() - begin
+
+    finish.set()
+    slow.join()
+    assert elapsed < 1
+
+
+def test_concurrent_acquires_share_one_load():
+    loads = []
+    release_loader = threading.Event()
+    pool = ModelPool(memory_budget_mb=100)
+
+    def loader(size, language):
+        loads.append(size)
+        release_loader.wait(5)
+        return FakeEngine(size, 1)
+
+    pool.register('fake', loader)
+    engines = []
+    threads = [threading.Thread(target=lambda: engines.append(pool.acquire('fake', 'a')))
+               for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release_loader.set()
+    for t in threads:
+        t.join()
+
+    assert loads == ['a']
+    assert len(engines) == 3 and all(e is engines[0] for e in engines)
+
+
+def test_failed_load_is_reported_and_retried():
+    attempts = []
+    pool = ModelPool(memory_budget_mb=100)
+
+    def loader(size, language):
+        attempts.append(size)
+        if len(attempts) == 1:
+            raise OSError("download failed")
+        return FakeEngine(size, 1)
+
+    pool.register('fake', loader)
+    with pytest.raises(OSError):
+        pool.acquire('fake', 'a')
+    assert pool.loaded() == []
+
+    assert pool.acquire('fake', 'a') is not None
+    assert len(attempts) == 2
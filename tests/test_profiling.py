@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from src.config import ProfilingConfig
+from src.profiling import RequestProfiler, StackSampler, audio_duration, filter_trace, top_ops
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    return RequestProfiler(ProfilingConfig(output_dir=str(tmp_path), python_interval_ms=1))
+
+
+def artifacts(path, suffix):
+    return sorted(p for p in path.iterdir() if p.name.endswith(suffix))
+
+
+def test_stack_sampler_sees_busy_function(tmp_path):
+    sampler = StackSampler(threading.get_ident(), interval=0.001)
+    sampler.start()
+    busy_loop(0.1)
+    sampler.stop()
+
+    assert sum(sampler.stacks.values()) > 0
+    assert any("busy_loop" in stack for stack in sampler.stacks)
+
+    sampler.write_folded(tmp_path / "out.folded")
+    line = (tmp_path / "out.folded").read_text().splitlines()[0]
+    stack, count = line.rsplit(" ", 1)
+    assert ";" in stack and int(count) > 0
+
+
+def test_per_call_flag_overrides_config():
+    profiler = RequestProfiler(ProfilingConfig(enabled=False))
+    assert profiler.should_profile(True) is True
+    assert profiler.should_profile() is False
+
+    profiler = RequestProfiler(ProfilingConfig(enabled=True, sample_rate=1.0))
+    assert profiler.should_profile(False) is False
+    assert profiler.should_profile() is True
+
+
+def test_zero_sample_rate_profiles_nothing():
+    profiler = RequestProfiler(ProfilingConfig(enabled=True, sample_rate=0.0))
+    assert not any(profiler.should_profile() for _ in range(100))
+
+
+def test_unprofiled_request_writes_nothing(profiler, tmp_path):
+    with profiler.capture(False) as tags:
+        assert tags is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_busy_profiler_skips_request(profiler, tmp_path):
+    with profiler.capture(True) as outer:
+        with profiler.capture(True) as inner:
+            assert inner is None
+        outer.update(engine='whisper', audio_samples=16000)
+
+    assert len(artifacts(tmp_path, ".trace.json")) == 1
+
+
+def test_artifacts_are_written_and_tagged(profiler, tmp_path):
+    with profiler.capture(True) as tags:
+        torch.ones(64, 64) @ torch.ones(64, 64)
+        tags.update(engine='indic', language='ml', audio_samples=32000, sample_rate=16000)
+
+    (sidecar,) = [p for p in artifacts(tmp_path, ".json") if not p.name.endswith(".trace.json")]
+    base = sidecar.name[:-len(".json")]
+    assert (tmp_path / f"{base}.trace.json").exists()
+    assert (tmp_path / f"{base}.folded").exists()
+    assert base.endswith("_indic_array_2.0s")
+
+    meta = json.loads(sidecar.read_text())
+    assert meta['engine'] == 'indic' and meta['language'] == 'ml'
+    assert meta['audio_duration'] == 2.0
+    assert meta['thread_id'] == threading.get_native_id()
+    assert meta['concurrent_requests'] == 1
+    assert any(op['name'] == 'aten::mm' for op in meta['top_ops'])
+
+
+def test_artifact_names_are_unique(profiler, tmp_path):
+    for _ in range(3):
+        with profiler.capture(True) as tags:
+            tags.update(engine='whisper', audio_path=None, audio_samples=16000)
+
+    assert len(artifacts(tmp_path, ".trace.json")) == 3
+    assert len(artifacts(tmp_path, ".folded")) == 3
+
+
+def test_trace_keeps_only_profiled_thread(tmp_path):
+    path = tmp_path / "t.trace.json"
+    path.write_text(json.dumps({'traceEvents': [
+        {'ph': 'X', 'pid': 10, 'tid': 1, 'name': 'mine'},
+        {'ph': 'X', 'pid': 10, 'tid': 2, 'name': 'other request'},
+        {'ph': 'M', 'pid': 10, 'tid': 2, 'name': 'thread_name'},
+        {'ph': 'X', 'pid': 0, 'tid': 7, 'name': 'gpu kernel'},
+        {'ph': 'X', 'pid': 'Spans', 'tid': 'PyTorch Profiler', 'name': 'span'},
+    ]}))
+
+    filter_trace(path, pid=10, tid=1)
+
+    names = [e['name'] for e in json.loads(path.read_text())['traceEvents']]
+    assert names == ['mine', 'thread_name', 'gpu kernel', 'span']
+
+
+def test_top_ops_count_one_thread():
+    def event(name, thread, self_us):
+        return SimpleNamespace(name=name, thread=thread, self_cpu_time_total=self_us,
+                               cpu_time_total=self_us, is_python_function=False)
+
+    ops = top_ops([
+        event('aten::mm', 1, 3000), event('aten::mm', 1, 1000),
+        event('aten::add', 1, 500), event('aten::conv1d', 2, 9000),
+    ], thread=1)
+
+    assert [op['name'] for op in ops] == ['aten::mm', 'aten::add']
+    assert ops[0]['calls'] == 2 and ops[0]['self_cpu_ms'] == 4.0
+
+
+def test_sidecar_counts_concurrent_requests(profiler):
+    inside, release = threading.Event(), threading.Event()
+
+    def other_request():
+        with profiler.capture(False):
+            inside.set()
+            release.wait()
+
+    with profiler.capture(True) as tags:
+        worker = threading.Thread(target=other_request)
+        worker.start()
+        inside.wait()
+        release.set()
+        worker.join()
+        tags.update(engine='whisper', audio_samples=16000)
+
+    assert tags['concurrent_requests'] == 2
+
+
+def test_audio_duration_from_samples():
+    assert audio_duration(num_samples=8000, sample_rate=16000) == 0.5
+    assert audio_duration() == 0.0
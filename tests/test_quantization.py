@@ -0,0 +1,47 @@
+import pytest
+import torch
+from torch import nn
+
+from src.model_pool import model_memory_mb
+from src.quantization import packed_weight_bytes, quantize_int8
+
+
+class SubclassLinear(nn.Linear):
+    """Stands in for whisper.model.Linear, which overrides forward"""
+
+    def forward(self, x):
+        return super().forward(x)
+
+
+class Engine:
+    def __init__(self, model):
+        self.model = model
+
+
+def test_subclassed_linear_layers_are_converted():
+    model = nn.Sequential(SubclassLinear(64, 32), nn.ReLU(), SubclassLinear(32, 8))
+    x = torch.randn(4, 64)
+    expected = model(x)
+
+    quantized = quantize_int8(model, linear_subclasses=(SubclassLinear,))
+
+    dynamic = [m for m in quantized.modules() if isinstance(m, torch.ao.nn.quantized.dynamic.Linear)]
+    assert len(dynamic) == 2
+    assert torch.allclose(quantized(x), expected, atol=0.1)
+
+
+def test_no_convertible_layers_raises():
+    model = nn.Sequential(SubclassLinear(8, 8))
+    with pytest.raises(RuntimeError):
+        quantize_int8(model)
+
+
+def test_pool_accounting_counts_packed_weights():
+    model = nn.Sequential(nn.Linear(1024, 1024), nn.Linear(1024, 8))
+    fp32_mb = model_memory_mb(Engine(model))
+
+    quantized = quantize_int8(model)
+
+    assert packed_weight_bytes(quantized) >= (1024 * 1024 + 1024 * 8)
+    # int8 weights take about a quarter of the fp32 footprint, not zero
+    assert 0.2 * fp32_mb < model_memory_mb(Engine(quantized)) < 0.5 * fp32_mb
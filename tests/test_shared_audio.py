@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from src.audio_processor import AudioProcessor
+from src.shared_audio import SharedAudioBuffer, CaptureProcess
+
+
+@pytest.fixture
+def ring():
+    buf = SharedAudioBuffer(num_blocks=4, block_size=8, create=True)
+    yield buf
+    buf.close()
+
+
+def block(value, n=8):
+    return np.full(n, value, dtype=np.float32)
+
+
+def test_read_returns_blocks_in_order(ring):
+    for i in range(3):
+        ring.write(block(i), timestamp=float(i))
+
+    blocks = ring.read()
+
+    assert [b.seq for b in blocks] == [0, 1, 2]
+    assert [b.timestamp for b in blocks] == [0.0, 1.0, 2.0]
+    assert all(np.all(b.samples == b.seq) for b in blocks)
+    assert ring.read() == []
+
+
+def test_short_block_keeps_its_length(ring):
+    ring.write(block(1, n=5))
+    (b,) = ring.read()
+    assert len(b.samples) == 5
+
+
+def test_attach_by_name_sees_writer(ring):
+    reader = SharedAudioBuffer(name=ring.name)
+    try:
+        ring.write(block(7))
+        (b,) = reader.read()
+        assert b.seq == 0 and np.all(b.samples == 7)
+    finally:
+        reader.close()
+
+
+def test_lapped_reader_skips_slot_being_written(ring):
+    for i in range(10):
+        ring.write(block(i))
+
+    blocks = ring.read()
+
+    # write_seq=10: slots for 7, 8, 9 are readable; slot of seq 6 is next to be rewritten
+    assert [b.seq for b in blocks] == [7, 8, 9]
+    assert ring.dropped == 7
+
+
+def test_slot_mid_write_is_not_returned(ring):
+    ring.write(block(0))
+    ring.write(block(1))
+    # Simulate the writer having invalidated slot 1 but not republished it
+    ring._seqs[1] = -1
+
+    blocks = ring.read()
+
+    assert [b.seq for b in blocks] == [0]
+    assert ring.dropped == 1
+
+
+def test_overwrite_after_read_fails_is_valid(ring):
+    ring.write(block(0))
+    (b,) = ring.read()
+    assert ring.is_valid(b)
+
+    for i in range(1, 5):
+        ring.write(block(i))
+
+    assert not ring.is_valid(b)
+
+
+def test_failure_flag_is_shared(ring):
+    reader = SharedAudioBuffer(name=ring.name)
+    try:
+        assert not reader.failed
+        ring.mark_failed()
+        assert reader.failed
+    finally:
+        reader.close()
+
+
+def test_ring_needs_two_blocks():
+    with pytest.raises(ValueError):
+        SharedAudioBuffer(num_blocks=1, block_size=8, create=True)
+
+
+def test_capture_check_reports_failure():
+    capture = CaptureProcess(sample_rate=16000, buffer_duration=1)
+    try:
+        capture.check()
+        capture.buffer.mark_failed()
+        with pytest.raises(RuntimeError):
+            capture.check()
+    finally:
+        capture.stop()
+
+
+def test_capture_process_is_spawned():
+    capture = CaptureProcess(sample_rate=16000, buffer_duration=1)
+    try:
+        assert capture._ctx.get_start_method() == "spawn"
+    finally:
+        capture.stop()
+
+
+def test_shared_chunk_matches_queue_mode():
+    processor = AudioProcessor(sample_rate=100, chunk_duration=0.2, shared_memory=True)
+    processor.capture = CaptureProcess(sample_rate=100, block_duration=0.1, buffer_duration=1)
+    ring = processor.capture.buffer
+    try:
+        assert processor.get_audio_chunk() is None
+
+        # Partial audio is returned rather than held back
+        ring.write(block(1, n=10))
+        assert np.array_equal(processor.get_audio_chunk(), block(1, n=10))
+
+        # At most one chunk per call; the rest is kept for the next one
+        for i in range(3):
+            ring.write(block(i, n=10))
+        assert len(processor.get_audio_chunk()) == 20
+        assert np.array_equal(processor.get_audio_chunk(), block(2, n=10))
+        assert processor.get_audio_chunk() is None
+    finally:
+        processor.capture.stop()
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+import torch
+import whisper
+from whisper.audio import HOP_LENGTH, N_FRAMES, SAMPLE_RATE
+
+from src.streaming_mel import StreamingLogMel
+
+
+def reference_features(audio):
+    """What transcribe_array feeds the encoder: pad_or_trim then log-mel"""
+    return whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(audio)))
+
+
+@pytest.fixture
+def audio():
+    rng = np.random.default_rng(0)
+    t = np.arange(3 * SAMPLE_RATE) / SAMPLE_RATE
+    tone = 0.3 * np.sin(2 * np.pi * 440 * t) + 0.05 * rng.standard_normal(len(t))
+    return tone.astype(np.float32)
+
+
+def test_matches_whisper_log_mel(audio):
+    stream = StreamingLogMel()
+    stream.append(audio)
+
+    features = stream.features()
+    reference = reference_features(audio)
+    content = len(audio) // HOP_LENGTH
+
+    assert features.shape == reference.shape == (80, N_FRAMES)
+    # Frames 0-1 overlap the start padding (zero here, reflect in Whisper) and
+    # the last couple of content frames need samples not received yet
+    np.testing.assert_allclose(
+        features[:, 2:content - 2], reference[:, 2:content - 2], atol=1e-4
+    )
+    np.testing.assert_allclose(
+        features[:, content + 2:], reference[:, content + 2:], atol=1e-4
+    )
+
+
+def test_incremental_appends_match_single_append(audio):
+    whole = StreamingLogMel()
+    whole.append(audio)
+
+    pieces = StreamingLogMel()
+    new_frames = 0
+    for start in range(0, len(audio), 1234):
+        new_frames += pieces.append(audio[start:start + 1234])
+
+    assert new_frames == whole.total_frames
+    np.testing.assert_allclose(pieces.features(), whole.features(), atol=1e-5)
+
+
+def test_window_keeps_latest_audio(audio):
+    stream = StreamingLogMel(window_seconds=1)
+    for start in range(0, len(audio), SAMPLE_RATE // 4):
+        stream.append(audio[start:start + SAMPLE_RATE // 4])
+
+    window = stream.window_frames
+    tail = StreamingLogMel()
+    tail.append(audio)
+    expected = tail._history[:, tail._end - window:tail._end]
+
+    assert stream.window_start == pytest.approx(stream.duration - 1.0)
+    np.testing.assert_allclose(stream._history[:, stream._end - window:stream._end], expected, atol=1e-5)
+
+
+def test_reset_clears_stream(audio):
+    stream = StreamingLogMel()
+    stream.append(audio)
+    stream.reset()
+    assert stream.total_frames == 0
+    assert stream.duration == 0
@@ -0,0 +1,244 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import whisper
+
+from src.config import Config, DecodingConfig, PerformanceConfig
+from src.whisper_stt import WhisperSTT
+
+
+SECOND = 100  # mel frames per second
+
+
+class StubModel:
+    """Stands in for whisper's model: canned greedy result, real mel dims"""
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.dims = SimpleNamespace(n_mels=80)
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append(kwargs)
+        return {
+            'text': ''.join(seg['text'] for seg in self.segments),
+            'segments': [dict(seg) for seg in self.segments],
+            'language': 'en'
+        }
+
+
+def segment(seek, text, no_speech_prob=0.1, avg_logprob=-0.2, compression_ratio=1.5):
+    return {
+        'id': 0, 'seek': seek, 'start': seek / SECOND, 'end': seek / SECOND + 1.0,
+        'text': text, 'tokens': [], 'temperature': 0.0, 'avg_logprob': avg_logprob,
+        'compression_ratio': compression_ratio, 'no_speech_prob': no_speech_prob
+    }
+
+
+def decode_result(text, avg_logprob=-0.2, compression_ratio=1.5, temperature=0.0,
+                  no_speech_prob=0.1):
+    return SimpleNamespace(
+        text=text, tokens=[1, 2], temperature=temperature, avg_logprob=avg_logprob,
+        compression_ratio=compression_ratio, no_speech_prob=no_speech_prob, language='en'
+    )
+
+
+def make_engine(segments, fast_path=True, batch_size=4):
+    engine = object.__new__(WhisperSTT)
+    engine.config = Config(
+        performance=PerformanceConfig(fp16=False, beam_size=5, best_of=5, batch_size=batch_size),
+        decoding=DecodingConfig(fast_path=fast_path, temperature_fallback=[0.0, 0.2, 0.4])
+    )
+    engine.config.model.language = None
+    engine.device = 'cpu'
+    engine.model = StubModel(segments)
+    return engine
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Record whisper.decode calls; results are popped from the returned list"""
+    calls = []
+    results = []
+
+    def fake_decode(model, mel, options):
+        calls.append((tuple(mel.shape), options))
+        if mel.ndim == 3:
+            return [results.pop(0) for _ in range(len(mel))]
+        return results.pop(0)
+
+    monkeypatch.setattr(whisper, "decode", fake_decode)
+    return SimpleNamespace(calls=calls, results=results)
+
+
+AUDIO = np.zeros(40 * 16000, dtype=np.float32)
+
+
+def test_easy_audio_stays_greedy(decodes):
+    engine = make_engine([segment(0, " hello"), segment(0, " world")])
+
+    result = engine.transcribe_array(AUDIO)
+
+    assert result['decoding'] == 'greedy'
+    assert result['text'] == " hello world"
+    assert engine.model.calls[0]['temperature'] == 0.0
+    assert decodes.calls == []
+
+
+def test_silence_exits_early(decodes):
+    engine = make_engine([segment(0, " you", no_speech_prob=0.9, avg_logprob=-1.5)])
+
+    result = engine.transcribe_array(AUDIO)
+
+    assert result['decoding'] == 'no_speech'
+    assert result['segments'] == [] and result['text'] == ''
+    assert decodes.calls == []
+
+
+def test_confident_window_is_kept_despite_no_speech_prob(decodes):
+    # whisper.transcribe keeps such windows too (avg_logprob > logprob_threshold)
+    engine = make_engine([segment(0, " quiet words", no_speech_prob=0.9, avg_logprob=-0.3)])
+
+    result = engine.transcribe_array(AUDIO)
+
+    assert result['decoding'] == 'greedy'
+    assert result['text'] == " quiet words"
+
+
+def test_only_failing_window_is_escalated(decodes):
+    engine = make_engine([
+        segment(0, " fine"),
+        segment(30 * SECOND, " la la la", compression_ratio=3.0),
+    ])
+    decodes.results.append(decode_result("fixed"))
+
+    result = engine.transcribe_array(AUDIO)
+
+    assert result['decoding'] == 'beam'
+    assert [seg['text'] for seg in result['segments']] == [" fine", " fixed"]
+    assert [seg['id'] for seg in result['segments']] == [0, 1]
+    (shape, options), = decodes.calls
+    assert shape == (1, 80, 3000)
+    assert options.beam_size == 5 and options.temperature == 0.0
+    # The escalated window spans 30 s..40 s of content
+    assert result['segments'][1]['start'] == pytest.approx(30.0)
+    assert result['segments'][1]['end'] == pytest.approx(40.0)
+
+
+def test_failing_windows_are_escalated_in_batches(decodes):
+    engine = make_engine([
+        segment(0, " a", compression_ratio=3.0),
+        segment(30 * SECOND, " b", compression_ratio=3.0),
+        segment(60 * SECOND, " c", compression_ratio=3.0),
+    ], batch_size=2)
+    decodes.results.extend([decode_result("A"), decode_result("B"), decode_result("C")])
+
+    result = engine.transcribe_array(np.zeros(90 * 16000, dtype=np.float32))
+
+    assert [seg['text'] for seg in result['segments']] == [" A", " B", " C"]
+    assert [shape for shape, _ in decodes.calls] == [(2, 80, 3000), (1, 80, 3000)]
+
+
+def test_fallback_retries_only_windows_that_still_fail(decodes):
+    engine = make_engine([
+        segment(0, " a", avg_logprob=-2.0),
+        segment(30 * SECOND, " b", avg_logprob=-2.0),
+    ])
+    decodes.results.extend([
+        decode_result("good"),
+        decode_result("bad", avg_logprob=-2.0),
+        decode_result("better", temperature=0.2),
+    ])
+
+    result = engine.transcribe_array(np.zeros(60 * 16000, dtype=np.float32))
+
+    assert [seg['text'] for seg in result['segments']] == [" good", " better"]
+    assert [shape[0] for shape, _ in decodes.calls] == [2, 1]
+
+
+def test_silent_window_is_dropped_and_not_escalated(decodes):
+    engine = make_engine([
+        segment(0, " speech"),
+        segment(30 * SECOND, " thanks for watching", no_speech_prob=0.95,
+                avg_logprob=-1.2, compression_ratio=3.0),
+    ])
+
+    result = engine.transcribe_array(AUDIO)
+
+    assert result['decoding'] == 'greedy'
+    assert result['text'] == " speech"
+    assert decodes.calls == []
+
+
+def test_temperature_fallback_after_beam(decodes):
+    engine = make_engine([segment(0, " noise", avg_logprob=-2.0)])
+    decodes.results.extend([
+        decode_result("still bad", avg_logprob=-2.0),
+        decode_result("good", temperature=0.2),
+    ])
+
+    result = engine.transcribe_array(AUDIO)
+
+    assert result['text'] == " good"
+    steps = [options for _, options in decodes.calls]
+    assert [o.temperature for o in steps] == [0.0, 0.2]
+    assert steps[0].beam_size == 5 and steps[1].best_of == 5
+
+
+def test_fast_path_disabled_uses_whisper_fallback(decodes):
+    engine = make_engine([segment(0, " hello")], fast_path=False)
+
+    result = engine.transcribe_array(AUDIO)
+
+    assert result['decoding'] == 'beam'
+    call = engine.model.calls[0]
+    assert call['beam_size'] == 5
+    assert call['temperature'] == (0.0, 0.2, 0.4)
+    assert call['no_speech_threshold'] == 0.6 and call['logprob_threshold'] == -1.0
+
+
+def test_streams_keep_separate_windows(decodes):
+    engine = make_engine([])
+    first, second = engine.open_stream(), engine.open_stream()
+    decodes.results.extend([decode_result("one"), decode_result("two"), decode_result("three")])
+
+    first.transcribe(np.zeros(16000, dtype=np.float32))
+    second.transcribe(np.zeros(8000, dtype=np.float32))
+    result = first.transcribe(np.zeros(16000, dtype=np.float32))
+
+    # duration trails the input by the few samples still waiting for a full STFT frame
+    assert first.mel.duration == pytest.approx(2.0, abs=0.02)
+    assert second.mel.duration == pytest.approx(0.5, abs=0.02)
+    assert result['segments'][0]['end'] == pytest.approx(2.0, abs=0.02)
+    assert all(shape[-2:] == (80, 3000) for shape, _ in decodes.calls)
+
+
+def test_stream_uses_the_same_silence_rule(decodes):
+    engine = make_engine([])
+    stream = engine.open_stream()
+    decodes.results.extend([
+        decode_result("you", no_speech_prob=0.9, avg_logprob=-1.5),
+        decode_result("quiet words", no_speech_prob=0.9, avg_logprob=-0.3),
+    ])
+
+    silent = stream.transcribe(np.zeros(16000, dtype=np.float32))
+    confident = stream.transcribe(np.zeros(16000, dtype=np.float32))
+
+    assert silent['decoding'] == 'no_speech' and silent['segments'] == []
+    assert confident['decoding'] == 'greedy' and confident['text'] == "quiet words"
+
+
+def test_stream_escalates_failing_window(decodes):
+    engine = make_engine([])
+    stream = engine.open_stream()
+    decodes.results.extend([
+        decode_result("la la la", compression_ratio=3.0),
+        decode_result("fixed"),
+    ])
+
+    result = stream.transcribe(np.zeros(16000, dtype=np.float32))
+
+    assert result['decoding'] == 'beam' and result['text'] == "fixed"
+    greedy, beam = [options for _, options in decodes.calls]
+    assert greedy.beam_size is None and beam.beam_size == 5